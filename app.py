@@ -1,13 +1,26 @@
-from flask import Flask, render_template_string, request, redirect, url_for, session
+from flask import Flask, render_template_string, request, redirect, url_for, session, has_request_context
 import dash
-from dash import dcc, html, Input, Output, State
+from dash import dcc, html, Input, Output, State, Patch
 import pandas as pd
-import plotly.express as px
-import joblib
+import plotly.graph_objects as go
 import numpy as np
-import sqlite3
+import io
+import os
+import atexit
+import threading
+import time
 from functools import wraps
-from flask import send_file
+from flask import send_file, jsonify, Response
+from patient_store import PatientStore
+from prediction_history import PredictionHistory
+from user_store import UserStore
+from data_loader import load_symptom_data
+from inference import predict_frame, scale_input_0_to_10, scale_symptoms, PredictionCache, FEATURE_COLUMNS
+from metrics import REGISTRY, CallbackCounter, Gauge, PREDICTIONS, PREDICTION_ERRORS, instrument_callback, stage_timer
+from precautions import get_precautions
+from excel_export import write_colored_excel
+from artifacts import artifact_matches, file_digest, load_pipeline, manifest_path as artifact_manifest_path
+from scoring_pool import ScoringPool
 
 
 # Initialize Flask
@@ -16,23 +29,10 @@ server.secret_key = 'your_secret_key_here_change_this'
 
 
 # Database Setup
-def setup_database():
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            username TEXT PRIMARY KEY,
-            password TEXT
-        )
-    """)
-    cursor.execute("SELECT * FROM users")
-    if not cursor.fetchone():
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", ("admin", "password"))
-        conn.commit()
-    conn.close()
-
-
-setup_database()
+user_store = UserStore(os.environ.get("USERS_DB", "users.db"))
+user_store.setup()
+# Shows the seeded admin/password login on the login page, for local development only
+SHOW_DEMO_LOGIN = os.environ.get("SHOW_DEMO_LOGIN", "0") == "1"
 
 @server.route('/background.jpg')
 def serve_background():
@@ -124,11 +124,13 @@ LOGIN_TEMPLATE = """
             </div>
             <button type="submit">Login</button>
         </form>
+        {% if show_demo_login %}
         <div class="info">
             <strong>Test Credentials:</strong><br>
             Username: admin<br>
             Password: password
         </div>
+        {% endif %}
     </div>
 </body>
 </html>
@@ -149,19 +151,14 @@ def login():
         username = request.form.get('username')
         password = request.form.get('password')
         
-        conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE username=? AND password=?", (username, password))
-        user = cursor.fetchone()
-        conn.close()
-        
-        if user:
+        if user_store.authenticate(username, password):
             session['username'] = username
             return redirect('/dashboard')
         else:
-            return render_template_string(LOGIN_TEMPLATE, error="Invalid username or password")
+            return render_template_string(LOGIN_TEMPLATE, error="Invalid username or password",
+                                          show_demo_login=SHOW_DEMO_LOGIN)
     
-    return render_template_string(LOGIN_TEMPLATE, error=None)
+    return render_template_string(LOGIN_TEMPLATE, error=None, show_demo_login=SHOW_DEMO_LOGIN)
 
 
 @server.route('/logout')
@@ -170,77 +167,520 @@ def logout():
     return redirect('/login')
 
 
+def login_required(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if 'username' not in session:
+            return jsonify({"error": "Login required"}), 401
+        return view(*args, **kwargs)
+    return wrapped
+
+
 # Initialize Dash app
 app = dash.Dash(__name__, server=server, url_base_pathname='/dashboard/')
 
 
+# Patient Store: bounded, thread-safe table of loaded and submitted patients
+PATIENT_STORE_MAX_ROWS = int(os.environ.get("PATIENT_STORE_MAX_ROWS", 100000))
+PATIENT_STORE_MAX_AGE = float(os.environ["PATIENT_STORE_MAX_AGE"]) if os.environ.get("PATIENT_STORE_MAX_AGE") else None
+patient_store = PatientStore(max_rows=PATIENT_STORE_MAX_ROWS, max_age=PATIENT_STORE_MAX_AGE)
+
+
+# Scoring Pool: worker processes for single predictions; 0 (the default) runs the model on the request thread.
+# Off by default because it is slower for this model: a compiled prediction takes microseconds, so the
+# queue and process hop dominate (~11k rows/s through the pool vs ~125k rows/s inline on one core, see
+# benchmarks/scoring_pool.py). It only pays off with many cores and a model far slower than the hop.
+# The workers are forked here, before any thread starts, and load_model reloads them in place. Under
+# `python app.py` the Werkzeug reloader imports this module in a watcher process and again in the
+# serving child (WERKZEUG_RUN_MAIN=true); only the serving process gets a pool.
+SCORING_PROCESSES = int(os.environ.get("SCORING_PROCESSES", 0))
+SCORING_MAX_BATCH_SIZE = int(os.environ.get("SCORING_MAX_BATCH_SIZE", 256))
+SCORING_MAX_WAIT_MS = float(os.environ.get("SCORING_MAX_WAIT_MS", 2))
+SERVING_PROCESS = __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+scoring_pool = None
+if SCORING_PROCESSES > 0 and SERVING_PROCESS:
+    scoring_pool = ScoringPool(None, SCORING_PROCESSES, SCORING_MAX_BATCH_SIZE, SCORING_MAX_WAIT_MS / 1000)
+
+
+# Prediction History: every submission is persisted; only a recent window is loaded back at startup
+HISTORY_DB = os.environ.get("PREDICTION_HISTORY_DB", "predictions.db")
+HISTORY_LOAD_ROWS = int(os.environ.get("HISTORY_LOAD_ROWS", 10000))
+HISTORY_LOAD_DAYS = float(os.environ["HISTORY_LOAD_DAYS"]) if os.environ.get("HISTORY_LOAD_DAYS") else None
+prediction_history = PredictionHistory(HISTORY_DB)
+prediction_history.setup()
+atexit.register(prediction_history.close)
+
+
 # Load Data and Models
-try:
-    df = pd.read_csv('SchizophreniaSymptomnsData.csv')
-    df.columns = df.columns.str.strip()
-    
-    model_data = joblib.load("model.pkl")
-    model = model_data["model"]
-    scaler = model_data["scaler"]
-    le_gender = model_data["le_gender"]
-    le_marital_status = model_data["le_marital_status"]
-    le_schizophrenia = model_data["le_schizophrenia"]
-except Exception as e:
-    print(f"Error loading data/models: {e}")
-    df = pd.DataFrame(columns=["Age", "Fatigue", "Schizophrenia", "Name", "Gender", "Slowing", "Pain", "Hygiene", "Movement"])
-    model = None
-
-
-# SCALING FUNCTION: Convert 0-10 input to model's expected range
-def scale_input_0_to_10(value):
+# Both load in a background warm-up thread so the Flask server can answer
+# /login straight away; /ready reports when they are available.
+WARMUP_IN_BACKGROUND = os.environ.get("WARMUP_IN_BACKGROUND", "1") != "0"
+MODEL_WAIT_TIMEOUT = float(os.environ.get("MODEL_WAIT_TIMEOUT", 60))
+MODEL_PATH = os.environ.get("MODEL_PATH", "model.pkl")
+MODEL_ARTIFACT = os.environ.get("MODEL_ARTIFACT", "model.artifact")
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 5))
+ADMIN_USERS = set(os.environ.get("ADMIN_USERS", "admin").split(","))
+model_ready = threading.Event()
+data_ready = threading.Event()
+model_lock = threading.Lock()
+pipeline = None
+model_version = None
+prediction_cache = PredictionCache(maxsize=int(os.environ.get("PREDICTION_CACHE_SIZE", 4096)))
+
+
+_model_digests = {}
+
+
+def _model_digest():
+    """Content hash of MODEL_PATH, recomputed only when the file changes."""
+    stat = os.stat(MODEL_PATH)
+    key = (stat.st_mtime_ns, stat.st_size)
+    if key not in _model_digests:
+        _model_digests.clear()
+        _model_digests[key] = file_digest(MODEL_PATH)
+    return _model_digests[key]
+
+
+def model_source():
     """
-    Converts user input (0-10 scale) to model's expected range (-0.1 to 1.1)
-    This maps: 0 -> 0.0, 5 -> 0.5, 10 -> 1.0
+    The memory-mapped artifact when its manifest records that it was
+    exported from MODEL_PATH as it is now (same path and content hash),
+    MODEL_PATH otherwise. An artifact of another model, or of an older
+    version of this one, is ignored.
+    """
+    manifest = artifact_manifest_path(MODEL_ARTIFACT)
+    if os.path.exists(manifest):
+        digest = _model_digest() if os.path.exists(MODEL_PATH) else None
+        if artifact_matches(MODEL_ARTIFACT, MODEL_PATH, digest):
+            return manifest
+    return MODEL_PATH
+
+
+def load_model():
     """
-    return value / 10.0
+    Loads or reloads the model and swaps it in with a single assignment.
+    Predictions already running finish on the pipeline they started with,
+    and a failed reload keeps the current model.
+    """
+    global pipeline, model_version
+    with model_lock:
+        try:
+            source = model_source()
+            version = (source, os.stat(source).st_mtime_ns)
+            model_file = MODEL_PATH if source == MODEL_PATH else MODEL_ARTIFACT
+            new_pipeline = load_pipeline(model_file)
+            if scoring_pool is not None:
+                # Worker processes load the same file, each once per version
+                scoring_pool.reload(model_file)
+            pipeline = new_pipeline
+            model_version = version
+            # Cached results belong to the previous model
+            prediction_cache.clear()
+            print(f"Loaded model from {source}")
+            return True
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            return False
+        finally:
+            model_ready.set()
+
+
+def watch_model():
+    """Polls the model source and hot-reloads it when it changes on disk."""
+    while True:
+        time.sleep(MODEL_WATCH_INTERVAL)
+        try:
+            source = model_source()
+            current = (source, os.stat(source).st_mtime_ns)
+        except OSError:
+            continue
+        if current != model_version:
+            load_model()
+
+
+def load_patients():
+    try:
+        patient_store.extend(load_symptom_data('SchizophreniaSymptomnsData.csv'))
+        since = time.time() - HISTORY_LOAD_DAYS * 86400 if HISTORY_LOAD_DAYS else None
+        patient_store.extend(prediction_history.recent(limit=HISTORY_LOAD_ROWS, since=since))
+    except Exception as e:
+        print(f"Error loading data: {e}")
+    finally:
+        data_ready.set()
+
+
+def warm_up():
+    load_model()
+    load_patients()
+    if MODEL_WATCH_INTERVAL > 0:
+        threading.Thread(target=watch_model, name="model-watch", daemon=True).start()
+
+
+if WARMUP_IN_BACKGROUND:
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+else:
+    warm_up()
+
+
+@server.route('/ready')
+def ready():
+    status = {
+        "model_loaded": pipeline is not None,
+        "data_loaded": data_ready.is_set()
+    }
+    return jsonify(status), 200 if all(status.values()) else 503
+
+
+@server.route('/api/model/reload', methods=['POST'])
+def reload_model():
+    if session.get('username') not in ADMIN_USERS:
+        return jsonify({"error": "Admin login required"}), 403
+    if not load_model():
+        return jsonify({"error": "Reload failed, keeping the current model"}), 500
+    return jsonify({"source": model_version[0], "mtime_ns": model_version[1]})
+
 
 # Prediction Function with SCALING and Correct Feature Names (NO AGE!)
 def predict_schizophrenia(age, gender, marital_status, fatigue, slowing, pain, hygiene, movement):
+    model_ready.wait(MODEL_WAIT_TIMEOUT)
     try:
-        # Scale inputs from 0-10 to 0-1 range
-        fatigue_scaled = scale_input_0_to_10(fatigue)
-        slowing_scaled = scale_input_0_to_10(slowing)
-        pain_scaled = scale_input_0_to_10(pain)
-        hygiene_scaled = scale_input_0_to_10(hygiene)
-        movement_scaled = scale_input_0_to_10(movement)
-        
-        # Create DataFrame with EXACT feature names the model expects (NO AGE!)
-        input_data = pd.DataFrame([[
-            le_gender.transform([gender])[0],
-            le_marital_status.transform([marital_status])[0],
-            round(fatigue_scaled, 4),
-            round(slowing_scaled, 4),
-            round(pain_scaled, 4),
-            round(hygiene_scaled, 4),
-            round(movement_scaled, 4),
-        ]], columns=['Gender', 'Marital_Status', 'Fatigue', 'Slowing', 'Pain', 'Hygiene', 'Movement'])
-        
-        # Scale the input data
-        input_data_scaled = scaler.transform(input_data)
-        
-        # Make prediction
-        prediction = model.predict(input_data_scaled)
-        predicted_stage = le_schizophrenia.inverse_transform(prediction)[0]
+        generation = prediction_cache.generation
+        active_pipeline = pipeline
+        # Features in the EXACT order the model expects (NO AGE!)
+        with stage_timer("encode"):
+            codes = active_pipeline.encode(gender, marital_status)
+        with stage_timer("scale"):
+            symptoms = scale_symptoms(fatigue, slowing, pain, hygiene, movement)
+        input_data = codes + symptoms
+
+        # Repeat inputs are answered from the cache; the model only sees new ones
+        predicted_stage = prediction_cache.get(input_data)
+        if predicted_stage is None:
+            with stage_timer("predict"):
+                if scoring_pool is not None:
+                    predicted_stage = scoring_pool.predict(input_data, MODEL_WAIT_TIMEOUT)
+                else:
+                    predicted_stage = active_pipeline.predict_one(input_data)
+            prediction_cache.put(input_data, predicted_stage, generation)
+        PREDICTIONS.inc(predicted_stage, "single")
         return predicted_stage
     except Exception as e:
+        PREDICTION_ERRORS.inc(type(e).__name__)
         print(f"Prediction error: {e}")
         return "Error in Prediction"
 
-# Precautions Function
-def get_precautions(level):
-    precautions = {
-        "Elevated Proneness": "Regular checkups, meditation, moderate physical activity.",
-        "Very High Proneness": "Immediate medical attention, medication as prescribed, high supervision, 8-9 hours of sleep.",
-        "High Proneness": "Monitor closely, engage in therapy sessions, ensure proper sleep (7-8 hours), avoid stress.",
-        "Low Proneness": "Light physical activity, engage in mindfulness practices, adequate sleep (7-8 hours).",
-        "Moderate Proneness": "Engage in group therapy, maintain a routine, avoid stress, 7-8 hours of sleep."
-    }
-    return precautions.get(level, "No precautions available.")
+# Batch Prediction: score a whole block of patients in one vectorized pass
+def predict_schizophrenia_batch(data):
+    """
+    Scores every row of `data` (SchizophreniaSymptomnsData.csv layout, symptoms
+    already on the model's 0-1 scale) through the active compiled pipeline.
+    Rows with unknown categories or missing symptom scores are marked
+    "Error in Prediction".
+    """
+    with stage_timer("predict_batch"):
+        predicted = predict_frame(pipeline, data)
+    levels, counts = np.unique(predicted.astype(str), return_counts=True)
+    for level, count in zip(levels, counts):
+        PREDICTIONS.inc(level, "batch", amount=int(count))
+    return predicted
+
+
+@server.route('/api/prediction-cache')
+@login_required
+def prediction_cache_stats():
+    return jsonify(prediction_cache.stats())
+
+
+@server.route('/api/scoring-pool')
+@login_required
+def scoring_pool_stats():
+    if scoring_pool is None:
+        return jsonify({"processes": 0, "error": "Scoring pool disabled; set SCORING_PROCESSES to enable it"}), 404
+    return jsonify(scoring_pool.stats())
+
+
+# Metrics: Prometheus text format, read by the scraper without a login like /ready
+def scoring_pool_gauge(key):
+    return lambda: scoring_pool.stats()[key] if scoring_pool is not None else None
+
+
+for name, help_text, function, labelname in [
+    ("schizophrenia_model_loaded", "1 once a model is loaded", lambda: int(pipeline is not None), None),
+    ("schizophrenia_patient_store_rows", "Patients held for the scatter plot", lambda: len(patient_store), None),
+    ("schizophrenia_prediction_cache_size", "Entries in the prediction cache", lambda: prediction_cache.stats()["size"], None),
+    ("schizophrenia_history_pending_rows", "Predictions waiting to be written to the history", prediction_history.pending, None),
+    ("schizophrenia_scoring_queue_depth", "Rows waiting for the scoring pool", scoring_pool_gauge("queue_depth"), None),
+    ("schizophrenia_scoring_in_flight_batches", "Batches running in the scoring pool", scoring_pool_gauge("in_flight_batches"), None),
+    ("schizophrenia_scoring_mean_batch_size", "Mean scoring pool batch size", scoring_pool_gauge("mean_batch_size"), None),
+]:
+    REGISTRY.register(Gauge(name, help_text, function, labelname))
+
+for name, help_text, function in [
+    ("schizophrenia_prediction_cache_lookups_total", "Prediction cache lookups since start",
+     lambda: {"hit": prediction_cache.hits, "miss": prediction_cache.misses}),
+    ("schizophrenia_history_rows_total", "Predictions written to or dropped from the history since start",
+     lambda: {"written": prediction_history.written, "dropped": prediction_history.dropped}),
+]:
+    REGISTRY.register(CallbackCounter(name, help_text, function, "result"))
+
+
+@server.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@server.route('/api/history')
+@login_required
+def prediction_history_page():
+    """
+    Pages through persisted predictions, newest first. Filters: user, level,
+    since (unix time). Pass the last id of a page as `before` for the next.
+    """
+    try:
+        limit = max(1, min(int(request.args.get('limit', 100)), 1000))
+        before = int(request.args['before']) if request.args.get('before') else None
+        since = float(request.args['since']) if request.args.get('since') else None
+    except ValueError:
+        return jsonify({"error": "limit and before must be integers, since a number"}), 400
+    rows = prediction_history.page(limit=limit, before=before, username=request.args.get('user'),
+                                   predicted=request.args.get('level'), since=since)
+    return jsonify({"predictions": rows, "next_before": rows[-1]["id"] if len(rows) == limit else None})
+
+
+@server.route('/api/export/patients.xlsx')
+@login_required
+def export_patients():
+    """Downloads the current patient table as an .xlsx with rows colored by level."""
+    buffer = io.BytesIO()
+    write_colored_excel(patient_store.to_frame().drop(columns=['Row_Id']), buffer)
+    buffer.seek(0)
+    return send_file(buffer, as_attachment=True, download_name="patients.xlsx",
+                     mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+@server.route('/api/predict/batch', methods=['POST'])
+@login_required
+def predict_batch():
+    """
+    Accepts either a JSON array of patient records or an uploaded CSV file
+    (form field "file") and returns the predicted stage for every row. CSV
+    uploads are answered with CSV, JSON requests with JSON.
+    """
+    if not model_ready.is_set():
+        return jsonify({"error": "Model is still loading"}), 503
+    if pipeline is None:
+        return jsonify({"error": "Model not loaded"}), 503
+
+    upload = request.files.get('file')
+    try:
+        if upload is not None:
+            data = pd.read_csv(upload, skipinitialspace=True)
+        else:
+            records = request.get_json(silent=True)
+            if not isinstance(records, list):
+                return jsonify({"error": "Expected a JSON array of patient records or a CSV file"}), 400
+            data = pd.DataFrame.from_records(records)
+        data.columns = data.columns.str.strip()
+        missing = [c for c in FEATURE_COLUMNS if c not in data.columns]
+        if missing:
+            return jsonify({"error": f"Missing columns: {', '.join(missing)}"}), 400
+        predicted = predict_schizophrenia_batch(data)
+    except Exception as e:
+        print(f"Batch prediction error: {e}")
+        return jsonify({"error": "Error in Prediction"}), 400
+
+    result = pd.DataFrame({"Predicted_Schizophrenia": predicted})
+    if 'Name' in data.columns:
+        result.insert(0, 'Name', data['Name'].fillna('').astype(str).str.strip().to_numpy())
+
+    if upload is not None:
+        return Response(result.to_csv(index=False), mimetype='text/csv',
+                        headers={"Content-Disposition": "attachment; filename=predictions.csv"})
+    return jsonify({"count": len(result), "predictions": result.to_dict(orient='records')})
+
+
+# Scatter Rendering: switch to WebGL and per-class downsampling for large cohorts
+CLASS_COLORS = {
+    'Elevated Proneness': '#10b981',
+    'Moderate Proneness': '#f59e0b',
+    'High Proneness': '#3b82f6',
+    'Very High Proneness': '#ef4444',
+    'Low Proneness': '#8b5cf6'
+}
+SCATTER_WEBGL_THRESHOLD = int(os.environ.get("SCATTER_WEBGL_THRESHOLD", 2000))
+SCATTER_DOWNSAMPLE_THRESHOLD = int(os.environ.get("SCATTER_DOWNSAMPLE_THRESHOLD", 20000))
+SCATTER_POINTS_PER_CLASS = int(os.environ.get("SCATTER_POINTS_PER_CLASS", 2000))
+
+
+def scatter_render_mode(n_rows):
+    """
+    "svg" draws every point with the full marker styling, "webgl" switches to
+    scattergl, and "downsample" additionally caps each class at
+    SCATTER_POINTS_PER_CLASS points.
+    """
+    if n_rows > SCATTER_DOWNSAMPLE_THRESHOLD:
+        return "downsample"
+    if n_rows > SCATTER_WEBGL_THRESHOLD:
+        return "webgl"
+    return "svg"
+
+
+def scatter_classes(df):
+    # Known classes first in a fixed order, anything else (e.g. errors) after
+    extra = sorted(set(df['Schizophrenia'].dropna().astype(str)) - set(CLASS_COLORS))
+    return list(CLASS_COLORS) + extra
+
+
+def empty_scatter_figure():
+    fig = go.Figure()
+    fig.update_layout(
+        height=500,
+        paper_bgcolor='#2d3748',
+        plot_bgcolor='#1a202c',
+        font=dict(color='#cbd5e0', size=12),
+        title=dict(
+            text="Patient Schizophrenia Levels - Awaiting Data",
+            font=dict(color='#e2e8f0', size=16, family='Arial')
+        ),
+        xaxis=dict(
+            title='Age',
+            gridcolor='#4a5568',
+            showgrid=True,
+            color='#cbd5e0',
+            linecolor='#4a5568',
+            range=[55, 100]
+        ),
+        yaxis=dict(
+            title='Fatigue',
+            gridcolor='#4a5568',
+            showgrid=True,
+            color='#cbd5e0',
+            linecolor='#4a5568',
+            range=[0, 1.2]
+        ),
+        annotations=[
+            dict(
+                text="Submit patient data to visualize analysis",
+                xref="paper",
+                yref="paper",
+                x=0.5,
+                y=0.5,
+                showarrow=False,
+                font=dict(size=14, color='#a0aec0')
+            )
+        ]
+    )
+    return fig
+
+
+def build_scatter_figure(df):
+    """
+    Builds the patient scatter with one trace per class. Only Age, Fatigue and
+    the row id are shipped to the browser; the rest of a patient's details
+    are fetched on hover by `show_patient_detail`.
+    """
+    if df.empty:
+        return empty_scatter_figure()
+
+    mode = scatter_render_mode(len(df))
+    trace_type = go.Scatter if mode == "svg" else go.Scattergl
+    if mode == "svg":
+        # Make scatter points LARGE and BRIGHT with white borders
+        marker = dict(size=14, line=dict(width=2, color='white'), opacity=1)
+    else:
+        marker = dict(size=6, opacity=0.8)
+
+    title = "Patient Schizophrenia Levels"
+    rng = np.random.default_rng(0)
+    labels = df['Schizophrenia'].astype(str).to_numpy()
+    traces = []
+    shown = 0
+    for level in scatter_classes(df):
+        index = np.flatnonzero(labels == level)
+        if mode == "downsample" and len(index) > SCATTER_POINTS_PER_CLASS:
+            index = np.sort(rng.choice(index, SCATTER_POINTS_PER_CLASS, replace=False))
+        shown += len(index)
+        # Plain lists rather than typed arrays so append_scatter_point can extend them
+        traces.append(trace_type(
+            x=df['Age'].to_numpy()[index].tolist(),
+            y=df['Fatigue'].to_numpy()[index].tolist(),
+            customdata=df['Row_Id'].to_numpy()[index].tolist(),
+            name=level,
+            mode='markers',
+            marker=dict(color=CLASS_COLORS.get(level, '#a0aec0'), **marker),
+            hovertemplate=level + "<br>Age=%{x}<br>Fatigue Level=%{y}<extra></extra>"
+        ))
+    if shown < len(df):
+        title += f" (showing {shown:,} of {len(df):,} patients)"
+
+    # Create scatter plot with HIGH CONTRAST bright colors
+    fig = go.Figure(data=traces)
+    fig.update_layout(title=title)
+    
+    # DARK GREY THEME with HIGH CONTRAST
+    fig.update_layout(
+        height=500,
+        paper_bgcolor='#2d3748',
+        plot_bgcolor='#1a202c',
+        font=dict(color='#cbd5e0', size=12),
+        title_font=dict(color='#e2e8f0', size=16, family='Arial'),
+        xaxis=dict(
+            title='Age',
+            gridcolor='#4a5568',
+            showgrid=True,
+            color='#cbd5e0',
+            linecolor='#4a5568',
+            zeroline=False
+        ),
+        yaxis=dict(
+            title='Fatigue Level',
+            gridcolor='#4a5568',
+            showgrid=True,
+            color='#cbd5e0',
+            linecolor='#4a5568',
+            zeroline=False
+        ),
+        legend=dict(
+            title=dict(text='Schizophrenia', font=dict(color='#e2e8f0', size=12)),
+            bgcolor='rgba(26, 32, 44, 0.95)',
+            bordercolor='#4a5568',
+            borderwidth=1,
+            font=dict(color='#e2e8f0', size=11),
+            x=1.02,
+            y=1,
+            xanchor='left',
+            yanchor='top'
+        ),
+        margin=dict(l=60, r=150, t=60, b=50),
+        showlegend=True,
+        hovermode='closest'
+    )
+    
+    return fig
+
+
+def scatter_figure_state(df):
+    """
+    What a figure from build_scatter_figure(df) holds: its render mode and
+    trace names in order. Kept per client in `figure-state`, so update_graph
+    only patches a figure it knows the layout of.
+    """
+    if df.empty:
+        return {"mode": None, "traces": []}
+    return {"mode": scatter_render_mode(len(df)), "traces": scatter_classes(df)}
+
+
+def append_scatter_point(record, row_id):
+    """
+    Returns a Patch that appends one patient to its class trace, relying on
+    build_scatter_figure always emitting the CLASS_COLORS traces in order.
+    """
+    patched_figure = Patch()
+    trace = patched_figure['data'][list(CLASS_COLORS).index(record["Schizophrenia"])]
+    trace['x'].append(record["Age"])
+    trace['y'].append(record["Fatigue"])
+    trace['customdata'].append(row_id)
+    return patched_figure
 
 
 # Dash Layout
@@ -273,6 +713,25 @@ app.layout = html.Div([
         'boxShadow': '0 4px 12px rgba(0,0,0,0.4)'
     }),
     
+    # Details of the hovered patient, looked up on demand instead of embedded in the figure
+    html.Div(id='patient-detail', style={
+        'marginTop': '-20px',
+        'marginBottom': '30px',
+        'padding': '12px 20px',
+        'background': '#2d3748',
+        'color': '#e2e8f0',
+        'borderRadius': '10px',
+        'fontSize': '14px',
+        'minHeight': '20px'
+    }),
+
+    html.A("⬇ Download patient table (Excel)", href='/api/export/patients.xlsx', style={
+        'display': 'inline-block',
+        'marginBottom': '30px',
+        'color': '#63b3ed',
+        'fontWeight': 'bold'
+    }),
+    
     html.Div([
         html.H2("Patient Information", style={'color': '#34495e', 'marginBottom': '20px'}),
         
@@ -358,6 +817,11 @@ app.layout = html.Div([
                     'boxShadow': '0 4px 8px rgba(0,0,0,0.2)'
                 }),
     
+    # Latest submission and its prediction, shared by the graph and precaution callbacks
+    dcc.Store(id='prediction-store'),
+    # Render mode and traces of the figure this browser holds (see scatter_figure_state)
+    dcc.Store(id='figure-state'),
+    
     html.Div(id='prediction-output', style={
         'padding': '20px',
         'background': 'rgba(232, 245, 233, 0.95)',
@@ -391,158 +855,109 @@ app.layout = html.Div([
     Output('username-display', 'children'),
     Input('submit-button', 'n_clicks')
 )
+@instrument_callback
 def display_username(n_clicks):
     username = session.get('username', 'Guest')
     return f"👤 Welcome, {username}!"
 
 
 @app.callback(
-    Output('scatter-plot', 'figure'),
+    Output('prediction-store', 'data'),
     [Input('submit-button', 'n_clicks')],
     [State('name', 'value'), State('age', 'value'), State('gender', 'value'),
      State('marital-status', 'value'), State('fatigue', 'value'), State('slowing', 'value'),
      State('pain', 'value'), State('hygiene', 'value'), State('movement', 'value')]
 )
-def update_graph(n_clicks, name, age, gender, marital_status, fatigue, slowing, pain, hygiene, movement):
-    global df
+@instrument_callback
+def run_prediction(n_clicks, name, age, gender, marital_status, fatigue, slowing, pain, hygiene, movement):
+    """
+    Runs the model once per submit and publishes the result to
+    `prediction-store`; the graph and precaution callbacks read it from there.
+    """
     if n_clicks > 0 and all(v is not None for v in [name, age, gender, marital_status, fatigue, slowing, pain, hygiene, movement]):
         predicted_stage = predict_schizophrenia(age, gender, marital_status, fatigue, slowing, pain, hygiene, movement)
-        
-        # Store SCALED values for graph display
-        new_data = pd.DataFrame([{
+        return {
+            "submission": n_clicks,
             "Name": name, "Age": age, "Gender": gender, "Marital_Status": marital_status,
-            "Fatigue": scale_input_0_to_10(fatigue),
-            "Slowing": scale_input_0_to_10(slowing),
-            "Pain": scale_input_0_to_10(pain),
-            "Hygiene": scale_input_0_to_10(hygiene),
-            "Movement": scale_input_0_to_10(movement),
+            "Fatigue": fatigue, "Slowing": slowing, "Pain": pain, "Hygiene": hygiene, "Movement": movement,
             "Schizophrenia": predicted_stage
-        }])
-        df = pd.concat([df, new_data], ignore_index=True)
-    
-    # Check if we have data
-    if df.empty or 'Age' not in df.columns or 'Fatigue' not in df.columns:
-        fig = px.scatter()
-        fig.update_layout(
-            height=500,
-            paper_bgcolor='#2d3748',
-            plot_bgcolor='#1a202c',
-            font=dict(color='#cbd5e0', size=12),
-            title=dict(
-                text="Patient Schizophrenia Levels - Awaiting Data",
-                font=dict(color='#e2e8f0', size=16, family='Arial')
-            ),
-            xaxis=dict(
-                title='Age',
-                gridcolor='#4a5568',
-                showgrid=True,
-                color='#cbd5e0',
-                linecolor='#4a5568',
-                range=[55, 100]
-            ),
-            yaxis=dict(
-                title='Fatigue',
-                gridcolor='#4a5568',
-                showgrid=True,
-                color='#cbd5e0',
-                linecolor='#4a5568',
-                range=[0, 1.2]
-            ),
-            annotations=[
-                dict(
-                    text="Submit patient data to visualize analysis",
-                    xref="paper",
-                    yref="paper",
-                    x=0.5,
-                    y=0.5,
-                    showarrow=False,
-                    font=dict(size=14, color='#a0aec0')
-                )
-            ]
-        )
-        return fig
-    
-    # Create scatter plot with HIGH CONTRAST bright colors
-    fig = px.scatter(
-        df, 
-        x="Age", 
-        y="Fatigue", 
-        color="Schizophrenia" if "Schizophrenia" in df.columns else None,
-        hover_data=["Name", "Gender", "Pain", "Hygiene", "Slowing"] if "Name" in df.columns else None,
-        title="Patient Schizophrenia Levels",
-        color_discrete_map={
-            'Elevated Proneness': '#10b981',
-            'Moderate Proneness': '#f59e0b',
-            'High Proneness': '#3b82f6',
-            'Very High Proneness': '#ef4444',
-            'Low Proneness': '#8b5cf6'
-        },
-        labels={"Fatigue": "Fatigue Level", "Age": "Age"}
-    )
-    
-    # DARK GREY THEME with HIGH CONTRAST
-    fig.update_layout(
-        height=500,
-        paper_bgcolor='#2d3748',
-        plot_bgcolor='#1a202c',
-        font=dict(color='#cbd5e0', size=12),
-        title_font=dict(color='#e2e8f0', size=16, family='Arial'),
-        xaxis=dict(
-            title='Age',
-            gridcolor='#4a5568',
-            showgrid=True,
-            color='#cbd5e0',
-            linecolor='#4a5568',
-            zeroline=False
-        ),
-        yaxis=dict(
-            title='Fatigue Level',
-            gridcolor='#4a5568',
-            showgrid=True,
-            color='#cbd5e0',
-            linecolor='#4a5568',
-            zeroline=False
-        ),
-        legend=dict(
-            title=dict(text='Schizophrenia', font=dict(color='#e2e8f0', size=12)),
-            bgcolor='rgba(26, 32, 44, 0.95)',
-            bordercolor='#4a5568',
-            borderwidth=1,
-            font=dict(color='#e2e8f0', size=11),
-            x=1.02,
-            y=1,
-            xanchor='left',
-            yanchor='top'
-        ),
-        margin=dict(l=60, r=150, t=60, b=50),
-        showlegend=True,
-        hovermode='closest'
-    )
-    
-    # Make scatter points LARGE and BRIGHT with white borders
-    fig.update_traces(
-        marker=dict(
-            size=14,
-            line=dict(width=2, color='white'),
-            opacity=1
-        )
-    )
-    
-    return fig
+        }
+    return None
+
+
+def render_scatter():
+    with stage_timer("figure_build"):
+        df = patient_store.to_frame()
+        return build_scatter_figure(df), scatter_figure_state(df)
+
+
+@app.callback(
+    [Output('scatter-plot', 'figure'), Output('figure-state', 'data')],
+    Input('prediction-store', 'data'),
+    State('figure-state', 'data')
+)
+@instrument_callback
+def update_graph(prediction, figure_state=None):
+    data_ready.wait(MODEL_WAIT_TIMEOUT)
+    if not prediction:
+        return render_scatter()
+
+    # Store SCALED values for graph display
+    record = {
+        "Name": prediction["Name"], "Age": prediction["Age"], "Gender": prediction["Gender"],
+        "Marital_Status": prediction["Marital_Status"],
+        "Fatigue": scale_input_0_to_10(prediction["Fatigue"]),
+        "Slowing": scale_input_0_to_10(prediction["Slowing"]),
+        "Pain": scale_input_0_to_10(prediction["Pain"]),
+        "Hygiene": scale_input_0_to_10(prediction["Hygiene"]),
+        "Movement": scale_input_0_to_10(prediction["Movement"]),
+        "Schizophrenia": prediction["Schizophrenia"]
+    }
+    row_id = patient_store.append(record)
+    # Callbacks are also called directly (benchmarks, scripts) without a request
+    username = session.get('username') if has_request_context() else None
+    prediction_history.record(record, username=username)
+
+    # Only send the new point when this browser's figure has the class traces
+    # in the render mode the table now needs. It may not: the awaiting-data
+    # figure has no traces, and submissions by other users or evictions can
+    # change the mode. Otherwise rebuild.
+    level = record["Schizophrenia"]
+    if (not figure_state or level not in CLASS_COLORS
+            or figure_state.get("mode") != scatter_render_mode(len(patient_store))
+            or figure_state.get("traces", [])[:len(CLASS_COLORS)] != list(CLASS_COLORS)):
+        return render_scatter()
+    with stage_timer("figure_patch"):
+        return append_scatter_point(record, row_id), dash.no_update
+
+
+@app.callback(
+    Output('patient-detail', 'children'),
+    Input('scatter-plot', 'hoverData')
+)
+@instrument_callback
+def show_patient_detail(hover_data):
+    if not hover_data or not hover_data.get('points'):
+        return "Hover over a patient to see their details."
+    row_id = hover_data['points'][0].get('customdata')
+    patient = patient_store.get(row_id) if row_id is not None else None
+    if patient is None:
+        return "Patient details are no longer available."
+    return (f"👤 {patient['Name']} | Gender: {patient['Gender']} | Age: {patient['Age']:g} | "
+            f"Pain: {patient['Pain']:.2f} | Hygiene: {patient['Hygiene']:.2f} | "
+            f"Slowing: {patient['Slowing']:.2f} | {patient['Schizophrenia']}")
 
 
 @app.callback(
     [Output('prediction-output', 'children'), Output('precautions-output', 'children')],
-    [Input('submit-button', 'n_clicks')],
-    [State('name', 'value'), State('age', 'value'), State('gender', 'value'),
-     State('marital-status', 'value'), State('fatigue', 'value'), State('slowing', 'value'),
-     State('pain', 'value'), State('hygiene', 'value'), State('movement', 'value')]
+    Input('prediction-store', 'data')
 )
-def predict_precautions(n_clicks, name, age, gender, marital_status, fatigue, slowing, pain, hygiene, movement):
-    if n_clicks > 0 and all(v is not None for v in ([name, age, gender, marital_status, fatigue, slowing, pain, hygiene, movement])):
-        predicted_stage = predict_schizophrenia(age, gender, marital_status, fatigue, slowing, pain, hygiene, movement)
+@instrument_callback
+def predict_precautions(prediction):
+    if prediction:
+        predicted_stage = prediction["Schizophrenia"]
         precautions = get_precautions(predicted_stage)
-        return f"🎯 Prediction for {name}: {predicted_stage}", f"⚕️ Precautions: {precautions}"
+        return f"🎯 Prediction for {prediction['Name']}: {predicted_stage}", f"⚕️ Precautions: {precautions}"
     return "", ""
 
 
@@ -0,0 +1,137 @@
+"""
+Approximate SVC mode for high-throughput scoring.
+
+Trains a kernel approximation (Nystroem or random Fourier features) for the
+deployed SVC's rbf gamma, followed by a linear SVM. It reuses the deployed
+model's encoders and scaler, and reports how often it agrees with the exact
+SVC on the held-out split in predictions_with_actual_and_predicted.csv,
+alongside accuracy and per-row cost. The result is saved in the model.pkl
+layout, so a deployment opts in with MODEL_PATH=model-approx.pkl:
+
+    python approximate.py --method nystroem --components 100 --output model-approx.pkl
+"""
+import argparse
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+
+from data_loader import load_all_symptom_data, DEFAULT_PATTERN, SYMPTOM_COLUMNS
+from inference import compile_pipeline, CompiledSVCPipeline, FEATURE_COLUMNS
+
+
+HELD_OUT_PATH = "predictions_with_actual_and_predicted.csv"
+
+
+def make_approximate_model(method="nystroem", gamma=0.1, n_components=100, C=1.0, random_state=42):
+    if method == "nystroem":
+        feature_map = Nystroem(kernel="rbf", gamma=gamma, n_components=n_components, random_state=random_state)
+    elif method == "rff":
+        feature_map = RBFSampler(gamma=gamma, n_components=n_components, random_state=random_state)
+    else:
+        raise ValueError(f"Unsupported method {method!r}. Choose 'nystroem' or 'rff'.")
+    return Pipeline([
+        ("feature_map", feature_map),
+        ("linear", LinearSVC(C=C, class_weight="balanced", random_state=random_state)),
+    ])
+
+
+def encode_and_scale(data, model_data):
+    """Encodes and scales raw symptom rows exactly as the deployed model was trained."""
+    features = pd.DataFrame({
+        'Gender': model_data["le_gender"].transform(data['Gender'].astype(str)),
+        'Marital_Status': model_data["le_marital_status"].transform(data['Marital_Status'].astype(str)),
+        **{column: data[column].round(2).to_numpy() for column in SYMPTOM_COLUMNS}
+    }, columns=FEATURE_COLUMNS)
+    return model_data["scaler"].transform(features)
+
+
+def rows_per_second(pipeline, features, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        pipeline.predict_encoded(features)
+    return repeats * len(features) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train an approximate SVC and compare it with the exact one.")
+    parser.add_argument("--model", default="model.pkl", help="Exact model whose gamma, encoders and scaler are reused")
+    parser.add_argument("--data", default=DEFAULT_PATTERN, help="Training CSV file or glob pattern")
+    parser.add_argument("--held-out", default=HELD_OUT_PATH)
+    parser.add_argument("--method", choices=["nystroem", "rff"], default="nystroem")
+    parser.add_argument("--components", type=int, default=100)
+    parser.add_argument("--C", type=float, default=1.0)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--output", default="model-approx.pkl")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model_data = joblib.load(args.model)
+    exact = model_data["model"]
+    exact_pipeline = compile_pipeline(model_data)
+    if not isinstance(exact_pipeline, CompiledSVCPipeline) or exact_pipeline.kernel != "rbf":
+        raise SystemExit(f"{args.model} holds a {type(exact).__name__}, not an rbf SVC; "
+                         f"the approximation stands in for an rbf SVC only.")
+    gamma = exact_pipeline.gamma
+
+    # Training rows, minus anything that also appears in the held-out split
+    held_out = pd.read_csv(args.held_out)
+    X_held_out = held_out[FEATURE_COLUMNS].to_numpy()
+    data = load_all_symptom_data(args.data, dropna=True).drop_duplicates()
+    X = encode_and_scale(data, model_data)
+    y = model_data["le_schizophrenia"].transform(data['Schizophrenia'].astype(str))
+    held_out_keys = set(map(tuple, np.round(X_held_out, 6)))
+    keep = np.array([tuple(row) not in held_out_keys for row in np.round(X, 6)], dtype=bool)
+    X, y = X[keep], y[keep]
+
+    from imblearn.over_sampling import SMOTE
+    X, y = SMOTE(random_state=args.random_state).fit_resample(X, y)
+
+    start = time.time()
+    approximate = make_approximate_model(args.method, gamma, args.components, args.C, args.random_state).fit(X, y)
+    train_seconds = time.time() - start
+
+    approximate_data = dict(model_data, model=approximate)
+    approximate_pipeline = compile_pipeline(approximate_data)
+
+    # The held-out features are already scaled; undo it so both pipelines see encoded rows.
+    # That is only right for the model that wrote the file, so its recorded predictions must
+    # match model.pkl (train.py --promote replaces model.pkl without rewriting the file).
+    encoded_held_out = X_held_out * exact_pipeline.scale + exact_pipeline.mean
+    exact_labels = exact_pipeline.predict_encoded(encoded_held_out)
+    stale = (exact_labels != held_out['Predicted_Schizophrenia'].to_numpy()).sum()
+    if stale:
+        raise SystemExit(f"{args.held_out} does not come from {args.model}: {stale} of {len(held_out)} recorded "
+                         f"predictions differ. Regenerate it with this model or pass its own --model.")
+    approximate_labels = approximate_pipeline.predict_encoded(encoded_held_out)
+    actual = held_out['Actual_Schizophrenia'].to_numpy()
+
+    print(f"Approximate model: {args.method}, {args.components} components, gamma={gamma:g} "
+          f"(exact SVC has {len(exact.support_vectors_)} support vectors)")
+    print(f"Trained on {len(y)} rows in {train_seconds:.2f}s")
+    print(f"Held-out split: {len(held_out)} rows from {args.held_out}")
+    print(f"  agreement with exact SVC: {(approximate_labels == exact_labels).mean() * 100:6.2f}%")
+    print(f"  accuracy, exact SVC:      {(exact_labels == actual).mean() * 100:6.2f}%")
+    print(f"  accuracy, approximate:    {(approximate_labels == actual).mean() * 100:6.2f}%")
+
+    batch = np.repeat(encoded_held_out, max(1, 20000 // len(encoded_held_out)), axis=0)
+    exact_rate = rows_per_second(exact_pipeline, batch)
+    approximate_rate = rows_per_second(approximate_pipeline, batch)
+    print(f"  throughput, exact SVC:    {exact_rate:12,.0f} rows/s")
+    print(f"  throughput, approximate:  {approximate_rate:12,.0f} rows/s ({approximate_rate / exact_rate:.1f}x)")
+    if approximate_rate < exact_rate:
+        print(f"Warning: the approximation is slower than the exact SVC; with {args.components} components "
+              f"it gains nothing. Keep the exact model, or try fewer components or --method nystroem.")
+
+    joblib.dump(approximate_data, args.output)
+    print(f"Model and preprocessing objects saved to {args.output}; deploy with MODEL_PATH={args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Memory-mapped model artifact format.
+
+An artifact is a directory with a manifest.json and one raw .npy file per
+numeric array CompiledSVCPipeline uses (support vectors and their norms,
+per-pair coefficients and intercepts, scaler mean/scale, ...). Array files are named by content hash and the manifest is
+replaced atomically, so an export never changes files a running process has
+open. Loading maps the arrays read-only with mmap, and every worker process
+on a host shares one physical copy through the page cache.
+
+    python artifacts.py model.pkl model.artifact
+"""
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from inference import CompiledSVCPipeline, compile_pipeline, svc_components
+
+
+ARTIFACT_FORMAT = 2
+MANIFEST = "manifest.json"
+ARRAY_NAMES = ["support_vectors", "support_vector_norms", "pair_coef", "pair_intercept", "pair_first", "pair_second",
+               "mean", "scale"]
+
+
+def manifest_path(path):
+    return os.path.join(path, MANIFEST)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_artifact(model_data, path, source=None):
+    """
+    Writes the SVC in a model.pkl dict to the artifact directory `path`.
+    `source` is the model.pkl file it was loaded from; its path and content
+    hash go in the manifest, so a server only uses the artifact in place of
+    that exact file (see `artifact_matches`).
+    """
+    components = svc_components(model_data)
+    os.makedirs(path, exist_ok=True)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        **{key: value for key, value in components.items() if key not in ARRAY_NAMES},
+        "arrays": {},
+    }
+    if source is not None:
+        manifest["source"] = {"path": os.path.abspath(source), "sha256": file_digest(source)}
+    for name in ARRAY_NAMES:
+        array = np.ascontiguousarray(components[name])
+        digest = hashlib.sha1(array.tobytes() + str(array.shape).encode()).hexdigest()[:16]
+        filename = f"{name}-{digest}.npy"
+        if not os.path.exists(os.path.join(path, filename)):
+            tmp_path = os.path.join(path, f".{filename}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, os.path.join(path, filename))
+        manifest["arrays"][name] = filename
+
+    tmp_manifest = os.path.join(path, f".{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_manifest, manifest_path(path))
+
+    # Arrays of earlier exports stay readable for processes that mapped them
+    # (the mapping outlives the directory entry), so they can go right away
+    referenced = set(manifest["arrays"].values())
+    for filename in os.listdir(path):
+        if filename.endswith(".npy") and filename not in referenced:
+            try:
+                os.remove(os.path.join(path, filename))
+            except OSError:
+                pass
+    return path
+
+
+def read_manifest(path):
+    with open(manifest_path(path)) as f:
+        return json.load(f)
+
+
+def artifact_matches(path, model_file, model_digest=None):
+    """
+    True when the artifact at `path` was exported from `model_file` as it is
+    now: same absolute path and, if the file exists, same content hash
+    (`model_digest` saves rehashing it). Artifacts without a recorded source
+    never match.
+    """
+    try:
+        source = read_manifest(path).get("source")
+    except (OSError, ValueError):
+        return False
+    if not source or source.get("path") != os.path.abspath(model_file):
+        return False
+    if not os.path.exists(model_file):
+        return True
+    return source.get("sha256") == (model_digest or file_digest(model_file))
+
+
+def load_artifact(path):
+    """Opens an artifact directory as a CompiledSVCPipeline over memory-mapped arrays."""
+    manifest = read_manifest(path)
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported artifact format {manifest.get('format')!r} in {path}")
+    components = {key: value for key, value in manifest.items() if key not in ("format", "arrays", "source")}
+    for name, filename in manifest["arrays"].items():
+        components[name] = np.load(os.path.join(path, filename), mmap_mode="r")
+    return CompiledSVCPipeline(components)
+
+
+def load_pipeline(path):
+    """Opens a model.pkl file, or an artifact directory, as the fastest available pipeline."""
+    if os.path.isdir(path):
+        return load_artifact(path)
+    # Deferred: joblib pulls in sklearn when unpickling, the slowest import we have
+    import joblib
+    return compile_pipeline(joblib.load(path))
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit(f"usage: python {os.path.basename(sys.argv[0])} MODEL_PKL ARTIFACT_DIR")
+    import joblib
+    export_artifact(joblib.load(sys.argv[1]), sys.argv[2], source=sys.argv[1])
+    print(f"Exported {sys.argv[1]} to {sys.argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
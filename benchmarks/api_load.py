@@ -0,0 +1,108 @@
+"""
+Load generator for predict_api.py. Opens --connections keep-alive
+connections and sends --requests POST /predict calls over them, drawn from
+--distinct different inputs (fewer distinct inputs means more coalescing and
+cache hits). Reports throughput, the status code mix and p50/p90/p99 latency.
+
+    python predict_api.py --port 8060 &
+    python benchmarks/api_load.py --port 8060 --connections 1000 --requests 50000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+def make_bodies(distinct, seed=0):
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(distinct):
+        payload = {
+            "gender": rng.choice(["Male", "Female"]),
+            "marital_status": rng.choice(["Single", "Married", "Divorced", "Widowed"]),
+            **{field: rng.randint(0, 10) for field in ["fatigue", "slowing", "pain", "hygiene", "movement"]},
+        }
+        bodies.append(json.dumps(payload).encode())
+    return bodies
+
+
+def request_bytes(host, body):
+    return (f"POST /predict HTTP/1.1\r\nhost: {host}\r\ncontent-type: application/json\r\n"
+            f"content-length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def connection(host, port, requests, latencies, statuses, start_event):
+    reader, writer = await asyncio.open_connection(host, port)
+    await start_event.wait()
+    try:
+        for payload in requests:
+            start = time.perf_counter()
+            writer.write(payload)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    bodies = [request_bytes(args.host, body) for body in make_bodies(args.distinct)]
+    rng = random.Random(1)
+    per_connection = [[] for _ in range(args.connections)]
+    for i in range(args.requests):
+        per_connection[i % args.connections].append(rng.choice(bodies))
+
+    latencies = []
+    statuses = {}
+    start_event = asyncio.Event()
+    tasks = [asyncio.create_task(connection(args.host, args.port, requests, latencies, statuses, start_event))
+             for requests in per_connection if requests]
+    # Let every connection open before the clock starts
+    await asyncio.sleep(0.5)
+    start = time.perf_counter()
+    start_event.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if isinstance(r, Exception)]
+    latencies_ms = np.array(latencies) * 1000
+    print(f"{len(latencies)} requests over {len(tasks)} connections in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:,.0f} requests/s)")
+    print(f"  status codes: {dict(sorted(statuses.items()))}")
+    if len(latencies_ms):
+        p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+        print(f"  latency ms: p50 {p50:.2f}  p90 {p90:.2f}  p99 {p99:.2f}  max {latencies_ms.max():.2f}")
+    if failed:
+        print(f"  {len(failed)} connections failed, e.g. {failed[0]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8060)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--distinct", type=int, default=500, help="Number of different request bodies")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Checks the compiled inference path against the sklearn pipeline on every
+complete row of the bundled data, then compares single-row latency.
+
+    python benchmarks/inference_latency.py --model model.pkl --rows 2000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import load_symptom_data, SYMPTOM_COLUMNS  # noqa: E402
+from inference import CompiledSVCPipeline, SklearnPipeline, svc_components  # noqa: E402
+
+
+def encoded_features(pipeline, data):
+    codes = [pipeline.encode(g, m) for g, m in zip(data['Gender'], data['Marital_Status'])]
+    return np.column_stack([np.array(codes, dtype=np.float64), data[SYMPTOM_COLUMNS].round(4).to_numpy()])
+
+
+def per_call_us(predict_one, rows):
+    start = time.perf_counter()
+    for row in rows:
+        predict_one(row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=os.path.join(ROOT, "model.pkl"))
+    parser.add_argument("--data", default=os.path.join(ROOT, "SchizophreniaSymptomnsData.csv"))
+    parser.add_argument("--rows", type=int, default=2000, help="Rows used for the latency loop")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model_data = joblib.load(args.model)
+    reference = SklearnPipeline(model_data)
+    compiled = CompiledSVCPipeline(svc_components(model_data))
+
+    features = encoded_features(compiled, load_symptom_data(args.data, dropna=True))
+    expected = reference.predict_encoded(features)
+    batch = compiled.predict_encoded(features)
+    single = np.array([compiled.predict_one(row) for row in features])
+    mismatches = int((batch != expected).sum() + (single != expected).sum())
+    print(f"parity: {len(features)} rows, {mismatches} mismatches")
+
+    rows = features[:args.rows]
+    sklearn_us = per_call_us(reference.predict_one, rows[:max(1, len(rows) // 10)])
+    compiled_us = per_call_us(compiled.predict_one, rows)
+    print(f"sklearn  predict_one: {sklearn_us:8.1f} us")
+    print(f"compiled predict_one: {compiled_us:8.1f} us  ({sklearn_us / compiled_us:.0f}x)")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures logins per second against a real threaded server with concurrent
+clients. Runs on a temporary copy of users.db, so the bundled one is untouched.
+
+    python benchmarks/login_throughput.py --clients 16 --logins 50
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent client threads")
+    parser.add_argument("--logins", type=int, default=50, help="Logins per client")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--iterations", type=int, help="PBKDF2 iterations (defaults to PASSWORD_HASH_ITERATIONS)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    shutil.copy(os.path.join(ROOT, "users.db"), os.path.join(workdir, "users.db"))
+    os.environ["USERS_DB"] = os.path.join(workdir, "users.db")
+    os.environ["PREDICTION_HISTORY_DB"] = os.path.join(workdir, "predictions.db")
+    if args.iterations:
+        os.environ["PASSWORD_HASH_ITERATIONS"] = str(args.iterations)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from werkzeug.serving import make_server
+    import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    server = make_server("127.0.0.1", args.port, app.server, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    url = f"http://127.0.0.1:{args.port}/login"
+    body = urllib.parse.urlencode({"username": "admin", "password": "password"}).encode()
+    no_redirect = urllib.request.build_opener(type("NoRedirect", (urllib.request.HTTPRedirectHandler,),
+                                                   {"redirect_request": lambda *a, **k: None}))
+    failures = []
+
+    def client():
+        for _ in range(args.logins):
+            try:
+                no_redirect.open(url, data=body)
+                failures.append("no redirect")
+            except urllib.error.HTTPError as e:
+                # A successful login answers with a redirect to /dashboard
+                if e.code != 302:
+                    failures.append(e.code)
+
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    total = args.clients * args.logins
+    print(f"{total} logins from {args.clients} clients in {elapsed:.2f}s: {total / elapsed:.1f} logins/s, "
+          f"{len(failures)} failures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Measures cold-start time of app.py in fresh interpreters: how long until the
+module is imported, until /login answers, and until /ready reports the model
+and patient data as loaded.
+
+    python benchmarks/startup_time.py --runs 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.server.test_client()
+assert client.get('/login').status_code == 200
+login = time.perf_counter()
+while client.get('/ready').status_code != 200:
+    if time.perf_counter() - start > 120:
+        raise SystemExit("app did not become ready within 120s")
+    time.sleep(0.005)
+ready = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_login": login - start, "ready": ready - start}))
+"""
+
+
+def run_once():
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    summary = {
+        stage: {"median": statistics.median(r[stage] for r in runs), "max": max(r[stage] for r in runs)}
+        for stage in ["import", "first_login", "ready"]
+    }
+    for stage, stats in summary.items():
+        print(f"{stage:<12} median {stats['median'] * 1000:8.1f} ms   max {stats['max'] * 1000:8.1f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"runs": runs, "summary": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
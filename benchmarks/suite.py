@@ -0,0 +1,308 @@
+"""
+Offline benchmark suite against the bundled model.pkl and
+SchizophreniaSymptomnsData*.csv files. It covers single-row and batch
+prediction, the update_graph callback (time and JSON payload size for
+growing patient tables), CSV loading, and a SMOTE + SVC training run.
+
+Each benchmark is timed over several repeats. The results are written to
+benchmarks/results/<commit>.json, and --compare flags benchmarks whose
+fastest repeat (the least noisy statistic) got slower than a baseline file
+by more than --threshold:
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --filter predict --compare benchmarks/results/<baseline>.json
+    python benchmarks/suite.py --quick
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    def register(function):
+        BENCHMARKS.append((name, function))
+        return function
+    return register
+
+
+def measure(function, repeats, warmup=1, **extra):
+    """Runs `function` warmup + repeats times and summarizes the timed runs."""
+    for _ in range(warmup):
+        function()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "repeats": repeats,
+        **extra,
+    }
+
+
+def load_app(workdir):
+    """
+    Imports app.py against a scratch copy of users.db and a scratch
+    prediction history, synchronously, with the model watcher off, so the
+    benchmarks neither race the warm-up nor touch the real databases.
+    """
+    shutil.copy(os.path.join(ROOT, "users.db"), os.path.join(workdir, "users.db"))
+    os.environ["USERS_DB"] = os.path.join(workdir, "users.db")
+    os.environ["PREDICTION_HISTORY_DB"] = os.path.join(workdir, "predictions.db")
+    os.environ["WARMUP_IN_BACKGROUND"] = "0"
+    os.environ["MODEL_WATCH_INTERVAL"] = "0"
+    os.environ["SYMPTOM_DATA_CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.chdir(ROOT)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        import app
+    return app
+
+
+def symptom_frame(app, n_rows):
+    """The bundled patients, repeated up to `n_rows` rows."""
+    base = app.load_symptom_data(os.path.join(ROOT, "SchizophreniaSymptomnsData.csv"), dropna=True,
+                                 cache_dir=None)
+    repeats = -(-n_rows // len(base))
+    return pd.concat([base] * repeats, ignore_index=True).iloc[:n_rows]
+
+
+def dashboard_input(i):
+    rng = np.random.default_rng(i)
+    return (30, ["Male", "Female"][i % 2], ["Single", "Married", "Divorced", "Widowed"][i % 4],
+            *[int(v) for v in rng.integers(0, 11, 5)])
+
+
+# Prediction
+@benchmark("predict_single")
+def bench_predict_single(ctx):
+    app = ctx["app"]
+    inputs = [dashboard_input(i) for i in range(ctx["rows_per_repeat"])]
+    maxsize = app.prediction_cache.maxsize
+    app.prediction_cache.maxsize = 0
+    app.prediction_cache.clear()
+    try:
+        result = measure(lambda: [app.predict_schizophrenia(*row) for row in inputs], ctx["repeats"])
+    finally:
+        app.prediction_cache.maxsize = maxsize
+    result["per_call_us"] = result["median"] / len(inputs) * 1e6
+    return result
+
+
+@benchmark("predict_single_cached")
+def bench_predict_single_cached(ctx):
+    app = ctx["app"]
+    inputs = [dashboard_input(i % 50) for i in range(ctx["rows_per_repeat"])]
+    app.prediction_cache.clear()
+    result = measure(lambda: [app.predict_schizophrenia(*row) for row in inputs], ctx["repeats"])
+    result["per_call_us"] = result["median"] / len(inputs) * 1e6
+    return result
+
+
+@benchmark("predict_batch")
+def bench_predict_batch(ctx):
+    app = ctx["app"]
+    results = {}
+    for n_rows in ctx["batch_sizes"]:
+        data = symptom_frame(app, n_rows)
+        result = measure(lambda: app.predict_schizophrenia_batch(data), ctx["repeats"])
+        result["rows_per_second"] = n_rows / result["median"]
+        results[str(n_rows)] = result
+    return {"cases": results}
+
+
+# Dashboard
+@benchmark("update_graph")
+def bench_update_graph(ctx):
+    """Full figure build (page load) and one-point Patch (submit) for growing patient tables."""
+    import plotly
+    from patient_store import PatientStore
+
+    app = ctx["app"]
+    original_store = app.patient_store
+    prediction = {"submission": 1, "Name": "Benchmark", "Age": 30, "Gender": "Male", "Marital_Status": "Single",
+                  "Fatigue": 5, "Slowing": 5, "Pain": 5, "Hygiene": 5, "Movement": 5,
+                  "Schizophrenia": "Moderate Proneness"}
+    results = {}
+    try:
+        for n_rows in ctx["graph_sizes"]:
+            store = PatientStore()
+            store.extend(symptom_frame(app, n_rows))
+            app.patient_store = store
+
+            figure, figure_state = app.update_graph(None)
+            full = measure(lambda: app.update_graph(None), ctx["repeats"])
+            full["payload_bytes"] = len(json.dumps(figure, cls=plotly.utils.PlotlyJSONEncoder))
+            full["render_mode"] = app.scatter_render_mode(n_rows)
+
+            patch, _ = app.update_graph(prediction, figure_state)
+            append = measure(lambda: app.update_graph(prediction, figure_state), ctx["repeats"])
+            append["payload_bytes"] = len(json.dumps(patch, cls=plotly.utils.PlotlyJSONEncoder))
+            results[str(n_rows)] = {"full": full, "append": append}
+    finally:
+        app.patient_store = original_store
+    return {"cases": results}
+
+
+# Loading
+@benchmark("load_csv")
+def bench_load_csv(ctx):
+    from data_loader import load_symptom_data, parse_symptom_csv
+
+    results = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "SchizophreniaSymptomnsData*.csv"))):
+        name = os.path.basename(path)
+        parsed = measure(lambda: parse_symptom_csv(path), ctx["repeats"])
+        cache_dir = os.path.join(ctx["workdir"], "load-cache")
+        cached = measure(lambda: load_symptom_data(path, cache_dir=cache_dir), ctx["repeats"])
+        results[name] = {"parse": parsed, "cached": cached, "rows": len(parse_symptom_csv(path))}
+    return {"cases": results}
+
+
+# Training
+@benchmark("train_smote_svc")
+def bench_train_smote_svc(ctx):
+    try:
+        from imblearn.over_sampling import SMOTE
+    except ImportError:
+        return {"skipped": "imbalanced-learn is not installed"}
+    from sklearn.model_selection import train_test_split
+    from training import load_data, make_estimator, preprocess_data
+
+    data = load_data(os.path.join(ROOT, "SchizophreniaSymptomnsData.csv"))
+    X, y, *_ = preprocess_data(data)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.16, random_state=42)
+
+    def run():
+        X_resampled, y_resampled = SMOTE(random_state=42).fit_resample(X_train, y_train)
+        make_estimator("svm").fit(X_resampled, y_resampled)
+
+    return measure(run, max(1, ctx["repeats"] // 3), warmup=0, train_rows=len(y_train))
+
+
+def flatten(results, statistic="median"):
+    """Flattens a results dict to {"name/case/...": seconds}."""
+    flat = {}
+    for name, result in results.items():
+        if statistic in result:
+            flat[name] = result[statistic]
+        for case, value in result.get("cases", {}).items():
+            if statistic in value:
+                flat[f"{name}/{case}"] = value[statistic]
+            for part, inner in value.items():
+                if isinstance(inner, dict) and statistic in inner:
+                    flat[f"{name}/{case}/{part}"] = inner[statistic]
+    return flat
+
+
+def compare(report, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    current, previous = flatten(report["benchmarks"], "min"), flatten(baseline["benchmarks"], "min")
+    regressions = []
+    print(f"\nFastest repeats compared with {baseline_path} ({baseline.get('commit')}):")
+    for key in ["quick", "cpu_count", "python"]:
+        if baseline.get(key) != report[key]:
+            print(f"  note: {key} differs ({baseline.get(key)} vs {report[key]}), so timings may not be comparable")
+    for key in sorted(set(current) & set(previous)):
+        ratio = current[key] / previous[key] if previous[key] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"  {key:<45} {previous[key] * 1000:10.3f} ms -> {current[key] * 1000:10.3f} ms  ({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats and smaller sizes, for a smoke run")
+    parser.add_argument("--output", help="Results file (defaults to benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="benchmarks-")
+    try:
+        ctx = {
+            "workdir": workdir,
+            "repeats": 3 if args.quick else args.repeats,
+            "rows_per_repeat": 1000,
+            "batch_sizes": [1000, 10000] if args.quick else [1000, 10000, 100000],
+            "graph_sizes": [1000, 5000] if args.quick else [1000, 5000, 20000, 100000],
+        }
+        ctx["app"] = load_app(workdir)
+
+        results = {}
+        for name, function in BENCHMARKS:
+            if args.filter and args.filter not in name:
+                continue
+            start = time.perf_counter()
+            results[name] = function(ctx)
+            print(f"{name:<24} done in {time.perf_counter() - start:6.2f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": args.quick,
+        "benchmarks": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    for key, seconds in flatten(results).items():
+        print(f"  {key:<45} {seconds * 1000:10.3f} ms")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import glob
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+
+# Layout of the fixed-width padded SchizophreniaSymptomnsData*.csv files
+COLUMNS = ['Name', 'Age', 'Gender', 'Marital_Status', 'Fatigue', 'Slowing', 'Pain', 'Hygiene', 'Movement', 'Schizophrenia']
+CATEGORICAL_COLUMNS = ['Gender', 'Marital_Status', 'Schizophrenia']
+SYMPTOM_COLUMNS = ['Fatigue', 'Slowing', 'Pain', 'Hygiene', 'Movement']
+COLUMN_DTYPES = {
+    'Name': str,
+    'Age': np.float64,
+    'Gender': str,
+    'Marital_Status': str,
+    'Schizophrenia': str,
+    **{column: np.float64 for column in SYMPTOM_COLUMNS}
+}
+
+DEFAULT_PATTERN = "SchizophreniaSymptomnsData*.csv"
+CACHE_DIR = os.environ.get("SYMPTOM_DATA_CACHE_DIR", ".cache")
+
+
+def _read_header(source, allowed):
+    header = pd.read_csv(source, nrows=0).columns.str.strip().tolist()
+    if header not in allowed:
+        raise ValueError(f"Unexpected columns {header}, expected {COLUMNS}")
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return header
+
+
+def _strip_text_columns(data):
+    for column in ['Name'] + CATEGORICAL_COLUMNS:
+        if column in data:
+            values = data[column].str.strip()
+            data[column] = values.mask(values == "")
+    return data
+
+
+def parse_symptom_csv(source):
+    """
+    Parses one padded symptom CSV (a path or file-like object) in a single
+    vectorized pass: padding is stripped per column, blank cells become NaN
+    and the categorical columns are stored as pandas categoricals.
+    """
+    _read_header(source, [COLUMNS])
+    data = pd.read_csv(source, header=0, names=COLUMNS, dtype=COLUMN_DTYPES, skipinitialspace=True)
+    _strip_text_columns(data)
+    for column in CATEGORICAL_COLUMNS:
+        data[column] = data[column].astype("category")
+    return data
+
+
+def iter_symptom_csv(source, chunksize=100000):
+    """
+    Reads a padded symptom CSV `chunksize` rows at a time, so files of any
+    size are processed in bounded memory. Intake files without the
+    Schizophrenia column are accepted. Text columns are stripped as in
+    parse_symptom_csv but kept as plain strings, since categories would
+    differ from chunk to chunk.
+    """
+    header = _read_header(source, [COLUMNS, COLUMNS[:-1]])
+    dtypes = {column: COLUMN_DTYPES[column] for column in header}
+    reader = pd.read_csv(source, header=0, names=header, dtype=dtypes, skipinitialspace=True, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield _strip_text_columns(chunk)
+
+
+def _cache_path(filepath, cache_dir):
+    stat = os.stat(filepath)
+    key = hashlib.sha1(f"{os.path.abspath(filepath)}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    extension = "parquet" if CACHE_FORMAT == "parquet" else "pkl"
+    return os.path.join(cache_dir, f"{stem}-{key}.{extension}"), stem
+
+
+def load_symptom_data(filepath, dropna=False, cache_dir=CACHE_DIR):
+    """
+    Loads a symptom CSV through a binary cache keyed on the file's path, mtime
+    and size. The first load parses the CSV and writes a Parquet (or pickle,
+    without pyarrow) copy to `cache_dir`; later loads read that copy instead.
+    Pass cache_dir=None to always parse. With dropna=True rows with any
+    missing value are dropped, matching the training notebooks.
+    """
+    data = None
+    cache_path = None
+    if cache_dir is not None:
+        cache_path, stem = _cache_path(filepath, cache_dir)
+        if os.path.exists(cache_path):
+            try:
+                data = pd.read_parquet(cache_path) if CACHE_FORMAT == "parquet" else pd.read_pickle(cache_path)
+            except Exception as e:
+                print(f"Ignoring unreadable cache {cache_path}: {e}")
+
+    if data is None:
+        data = parse_symptom_csv(filepath)
+        if cache_path is not None:
+            _write_cache(data, cache_path, stem)
+
+    if dropna:
+        data = data.dropna().reset_index(drop=True)
+    return data
+
+
+def _write_cache(data, cache_path, stem):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Drop caches of older versions of the same file
+        for stale in glob.glob(os.path.join(os.path.dirname(cache_path), f"{stem}-*")):
+            if stale != cache_path:
+                os.remove(stale)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        if CACHE_FORMAT == "parquet":
+            data.to_parquet(tmp_path, index=False)
+        else:
+            data.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not write cache {cache_path}: {e}")
+
+
+def load_all_symptom_data(pattern=DEFAULT_PATTERN, dropna=False, cache_dir=CACHE_DIR):
+    """Loads every CSV matching `pattern` through the cache and stacks them."""
+    filepaths = sorted(glob.glob(pattern))
+    if not filepaths:
+        raise FileNotFoundError(f"No files match {pattern}")
+    frames = [load_symptom_data(filepath, dropna=dropna, cache_dir=cache_dir) for filepath in filepaths]
+    data = pd.concat(frames, ignore_index=True)
+    # Re-unify the categories, which differ per file after concatenation
+    for column in CATEGORICAL_COLUMNS:
+        data[column] = data[column].astype("category")
+    return data
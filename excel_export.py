@@ -0,0 +1,79 @@
+import pandas as pd
+
+
+# Light fill for each predicted stage, keyed by the decoded label
+CLASS_FILLS = {
+    "Elevated Proneness": "FFDDC1",   # light red
+    "Very High Proneness": "C1E1C1",  # light green
+    "High Proneness": "D1E1FF",       # light blue
+    "Low Proneness": "FFDDFF",        # light pink
+    "Moderate Proneness": "FFF5C1",   # light yellow
+}
+EXPORT_CHUNK_SIZE = 10000
+
+
+def _chunks(data, chunk_size):
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+    else:
+        yield from data
+
+
+def write_colored_excel(data, destination, label_column="Schizophrenia", sheet_name="Patients",
+                        chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Writes `data` (a DataFrame, or an iterable of DataFrames with the same
+    columns) to an .xlsx path or binary file object, filling every cell of
+    a row with the color of its `label_column` value. Rows are streamed
+    through openpyxl's write-only mode, so memory stays flat however many
+    rows there are. Returns the number of rows written.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    fills = {label: PatternFill(fill_type="solid", start_color=color, end_color=color)
+             for label, color in CLASS_FILLS.items()}
+
+    def start(frame_columns):
+        columns = [str(column) for column in frame_columns]
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(sheet, column)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        sheet.append(header)
+        # One row of styled cells per class; write-only sheets serialize a
+        # row as soon as it is appended, so the cells can be refilled
+        styled = {}
+        for label, fill in [*fills.items(), (None, None)]:
+            cells = [WriteOnlyCell(sheet) for _ in columns]
+            if fill is not None:
+                for cell in cells:
+                    cell.fill = fill
+            styled[label] = cells
+        return columns.index(label_column), styled
+
+    rows = 0
+    # A DataFrame's header is written even when it has no rows
+    started = start(data.columns) if isinstance(data, pd.DataFrame) else None
+    for chunk in _chunks(data, chunk_size):
+        if started is None:
+            started = start(chunk.columns)
+        label_index, styled = started
+
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            cells = styled.get(row[label_index], styled[None])
+            for cell, value in zip(cells, row):
+                cell.value = value
+            sheet.append(cells)
+        rows += len(chunk)
+
+    if started is None:
+        sheet.append([label_column])
+    workbook.save(destination)
+    return rows
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed, parallel_config
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+
+def _fit_and_score(estimator, params, X, y, train_index, test_index):
+    model = clone(estimator).set_params(**params)
+    model.fit(X[train_index], y[train_index])
+    return accuracy_score(y[test_index], model.predict(X[test_index]))
+
+
+class ScoreCache:
+    """
+    Append-only JSON-lines file of (candidate, fold, resources) -> score.
+    Every score is flushed as soon as it is computed, so an interrupted
+    search resumes where it stopped and a repeated one costs no fits.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.scores = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A write cut short by an interruption
+                        continue
+                    self.scores[entry["key"]] = entry["score"]
+
+    def get(self, key):
+        return self.scores.get(key)
+
+    def put(self, key, score):
+        self.scores[key] = score
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"key": key, "score": score}) + "\n")
+
+
+class SuccessiveHalvingSearch:
+    """
+    Budgeted hyperparameter search by successive halving.
+
+    Every round scores the surviving candidates with `cv` stratified folds,
+    training each fold on the first `resources` rows of a fixed shuffle of
+    its training split, then keeps the best 1/eta of them for the next round
+    with eta times more rows. The last round trains on full folds. Fits run in
+    `n_jobs` joblib workers limited to one thread each, and each (params,
+    fold, resources) score is kept in a ScoreCache on disk.
+
+    The search stops early once `time_budget` seconds or `max_fits` new fits
+    are used up. The winner is then the best candidate of the last round that
+    has complete scores. With refit=True it is refit on all of X, y.
+    """
+
+    def __init__(self, estimator, param_distributions, n_candidates=None, cv=5, eta=3,
+                 min_resources=None, time_budget=None, max_fits=None, cache_path=None,
+                 n_jobs=-1, random_state=42, refit=True, verbose=0):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.n_candidates = n_candidates
+        self.cv = cv
+        self.eta = eta
+        self.min_resources = min_resources
+        self.time_budget = time_budget
+        self.max_fits = max_fits
+        self.cache_path = cache_path
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.refit = refit
+        self.verbose = verbose
+
+    def _candidates(self):
+        grid = ParameterGrid(self.param_distributions)
+        if self.n_candidates is None or self.n_candidates >= len(grid):
+            return list(grid)
+        return list(ParameterSampler(self.param_distributions, self.n_candidates, random_state=self.random_state))
+
+    def _key(self, params, fold, resources):
+        payload = json.dumps({
+            "estimator": type(self.estimator).__name__,
+            # Thread counts do not change a fit's score, so they do not invalidate the cache
+            "base_params": {k: v for k, v in self.estimator.get_params(deep=False).items() if k != "n_jobs"},
+            "params": params,
+            "fold": fold,
+            "cv": self.cv,
+            "resources": resources,
+            "random_state": self.random_state,
+            "data": self._data_hash,
+        }, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _budget_left(self):
+        if self.time_budget is not None and time.time() - self._start > self.time_budget:
+            return False
+        if self.max_fits is not None and self.n_fits_ >= self.max_fits:
+            return False
+        return True
+
+    def _evaluate(self, candidates, resources, folds, X, y):
+        """Returns {candidate index: [fold scores]}, possibly incomplete if the budget ran out."""
+        scores = {i: [None] * len(folds) for i in range(len(candidates))}
+        tasks = []
+        for i, params in enumerate(candidates):
+            for k, (train_index, test_index) in enumerate(folds):
+                key = self._key(params, k, resources)
+                cached = self._cache.get(key)
+                if cached is not None:
+                    scores[i][k] = cached
+                    self.n_cached_ += 1
+                else:
+                    tasks.append((i, k, key, params, train_index[:resources], test_index))
+
+        if self.max_fits is not None:
+            tasks = tasks[:max(0, self.max_fits - self.n_fits_)]
+        if tasks and self._budget_left():
+            # One thread per worker, so n_jobs workers use n_jobs cores even for
+            # estimators (xgboost, BLAS) that would otherwise start a thread per core
+            with parallel_config(backend="loky", inner_max_num_threads=1):
+                results = Parallel(n_jobs=self.n_jobs, return_as="generator")(
+                    delayed(_fit_and_score)(self.estimator, params, X, y, train_index, test_index)
+                    for _, _, _, params, train_index, test_index in tasks
+                )
+                for (i, k, key, _, _, _), score in zip(tasks, results):
+                    scores[i][k] = score
+                    self._cache.put(key, score)
+                    self.n_fits_ += 1
+                    if not self._budget_left():
+                        break
+        return scores
+
+    def fit(self, X, y):
+        X = np.asarray(X)
+        y = np.asarray(y)
+        self._start = time.time()
+        self._cache = ScoreCache(self.cache_path)
+        self._data_hash = hashlib.sha1(np.ascontiguousarray(X).tobytes() + np.ascontiguousarray(y).tobytes()).hexdigest()
+        self.n_fits_ = 0
+        self.n_cached_ = 0
+        self.history_ = []
+
+        rng = np.random.RandomState(self.random_state)
+        splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        folds = [(rng.permutation(train_index), test_index) for train_index, test_index in splitter.split(X, y)]
+
+        candidates = self._candidates()
+        max_resources = min(len(train_index) for train_index, _ in folds)
+        n_rounds = 1 + math.ceil(math.log(len(candidates), self.eta)) if len(candidates) > 1 else 1
+        min_resources = self.min_resources or 20 * len(np.unique(y))
+        min_resources = min(max_resources, max(min_resources, max_resources // self.eta ** (n_rounds - 1)))
+
+        best = None
+        for round_index in range(n_rounds):
+            resources = min(max_resources, min_resources * self.eta ** round_index)
+            scores = self._evaluate(candidates, resources, folds, X, y)
+            complete = {i: float(np.mean(s)) for i, s in scores.items() if None not in s}
+            partial = {i: float(np.mean([v for v in s if v is not None]))
+                       for i, s in scores.items() if any(v is not None for v in s)}
+            ranked = complete or (partial if best is None else {})
+            if ranked:
+                i = max(ranked, key=ranked.get)
+                best = (candidates[i], ranked[i])
+            self.history_.append({
+                "round": round_index,
+                "resources": resources,
+                "n_candidates": len(candidates),
+                "n_complete": len(complete),
+                "best_params": best[0] if best else None,
+                "best_score": best[1] if best else None,
+            })
+            if self.verbose:
+                print(f"Round {round_index}: {len(candidates)} candidates on {resources} rows, "
+                      f"best {best[1] if best else float('nan'):.4f} ({self.n_fits_} fits, {self.n_cached_} cached)")
+            if len(complete) < len(candidates) or len(candidates) == 1:
+                # Budget exhausted, or a single survivor left
+                break
+            keep = max(1, math.ceil(len(candidates) / self.eta))
+            order = sorted(complete, key=complete.get, reverse=True)[:keep]
+            candidates = [candidates[i] for i in order]
+
+        if best is None:
+            raise RuntimeError("Search budget exhausted before any candidate was scored")
+        self.best_params_, self.best_score_ = best
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        return self
@@ -0,0 +1,205 @@
+"""
+Incremental training from new clinician-confirmed labels.
+
+Instead of refitting the encoders and scaler, oversampling and retraining
+the SVC on the whole growing dataset, this keeps a linear SGDClassifier
+(log loss) and running StandardScaler statistics, and updates both with
+`partial_fit` on only the new rows. The encoders are taken from the deployed
+model, so codes never change between updates. Each update is saved in the
+model.pkl layout (plus an "incremental" entry with the running class counts
+and an update log), so a deployment opts in with
+MODEL_PATH=model-incremental.pkl and running dashboards hot-reload it.
+
+Start from the existing data once, then feed each new batch of labels:
+
+    python incremental.py --init --data "SchizophreniaSymptomnsData*.csv"
+    python incremental.py --data confirmed-labels.csv
+"""
+import argparse
+import glob
+import os
+import time
+import warnings
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from data_loader import iter_symptom_csv, SYMPTOM_COLUMNS
+from inference import FEATURE_COLUMNS
+
+
+INCREMENTAL_MODEL_PATH = os.environ.get("INCREMENTAL_MODEL_PATH", "model-incremental.pkl")
+CHUNK_SIZE = 10000
+
+
+def make_incremental_model(alpha=0.0001, random_state=42):
+    return SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+
+
+def new_model_data(base_data, alpha=0.0001, random_state=42):
+    """An untrained model.pkl dict that reuses the encoders of `base_data`."""
+    return {
+        "model": make_incremental_model(alpha, random_state),
+        "scaler": StandardScaler(),
+        "le_gender": base_data["le_gender"],
+        "le_marital_status": base_data["le_marital_status"],
+        "le_schizophrenia": base_data["le_schizophrenia"],
+        "feature_columns": list(FEATURE_COLUMNS),
+        "incremental": {
+            "class_counts": np.zeros(len(base_data["le_schizophrenia"].classes_), dtype=np.int64),
+            "updates": [],
+        },
+    }
+
+
+def _codes(values, classes):
+    """Label codes for `values`, with -1 for labels the encoder has never seen."""
+    classes = np.asarray(classes).astype(str)
+    positions = np.searchsorted(classes, values)
+    positions[positions == len(classes)] = 0
+    return np.where(classes[positions] == values, positions, -1)
+
+
+def encode_rows(data, model_data):
+    """
+    Encodes labelled rows the way preprocess_data does. Returns the unscaled
+    features, the label codes and how many rows were skipped for a missing
+    value or a category the encoders do not know.
+    """
+    rows = len(data)
+    data = data.dropna(subset=FEATURE_COLUMNS + ['Schizophrenia'])
+    gender = _codes(data['Gender'].to_numpy(dtype=str), model_data["le_gender"].classes_)
+    marital_status = _codes(data['Marital_Status'].to_numpy(dtype=str), model_data["le_marital_status"].classes_)
+    labels = _codes(data['Schizophrenia'].to_numpy(dtype=str), model_data["le_schizophrenia"].classes_)
+    known = (gender >= 0) & (marital_status >= 0) & (labels >= 0)
+
+    X = np.column_stack([gender, marital_status, data[SYMPTOM_COLUMNS].round(2).to_numpy(dtype=np.float64)])
+    return X[known], labels[known], rows - int(known.sum())
+
+
+def update_scaler(model_data, X):
+    """
+    Adds `X` to the running scaler statistics. The linear model's weights
+    were learned on the old scaling, so the change is folded into them:
+    every decision value is the same before and after, only the new rows
+    move the model.
+    """
+    scaler, model = model_data["scaler"], model_data["model"]
+    if not hasattr(scaler, "mean_"):
+        scaler.partial_fit(X)
+        return
+    old_mean, old_scale = scaler.mean_.copy(), scaler.scale_.copy()
+    scaler.partial_fit(X)
+    if hasattr(model, "coef_"):
+        model.intercept_ = model.intercept_ + model.coef_ @ ((scaler.mean_ - old_mean) / old_scale)
+        model.coef_ = np.ascontiguousarray(model.coef_ * (scaler.scale_ / old_scale))
+
+
+def partial_fit(model_data, X, y, learn_scaling=True):
+    """
+    Updates the scaler (optionally) and the model with one chunk of encoded
+    rows. In place of SMOTE, classes are weighted from the running class
+    counts the way class_weight="balanced" weights them in a full fit (which
+    partial_fit does not accept). Returns the model's accuracy on the chunk
+    before it learned from it, or None for an untrained model.
+    """
+    model = model_data["model"]
+    state = model_data["incremental"]
+    classes = np.arange(len(model_data["le_schizophrenia"].classes_))
+    accuracy = None
+    if hasattr(model, "coef_"):
+        accuracy = float((model.predict(model_data["scaler"].transform(X)) == y).mean())
+
+    if learn_scaling:
+        update_scaler(model_data, X)
+        state["class_counts"] = state["class_counts"] + np.bincount(y, minlength=len(classes))
+    counts = np.maximum(state["class_counts"], 1)
+    model.set_params(class_weight=dict(enumerate(counts.sum() / (len(classes) * counts))))
+    model.partial_fit(model_data["scaler"].transform(X), y, classes=classes)
+    return accuracy
+
+
+def save_model_data(model_data, path):
+    """Writes to a temporary file first, so a hot-reloading dashboard never sees a partial file."""
+    temporary = f"{path}.tmp"
+    joblib.dump(model_data, temporary)
+    os.replace(temporary, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the incremental model with new labelled rows.")
+    parser.add_argument("--data", nargs="+", required=True,
+                        help="Labelled CSV files or glob patterns in the SchizophreniaSymptomnsData layout")
+    parser.add_argument("--model", default=INCREMENTAL_MODEL_PATH, help="Incremental model to update")
+    parser.add_argument("--output", help="Where to write the updated model (defaults to --model)")
+    parser.add_argument("--init", action="store_true",
+                        help="Start a new model instead of updating --model, reusing the encoders of --base")
+    parser.add_argument("--base", default="model.pkl", help="Deployed model whose encoders a new model reuses")
+    parser.add_argument("--epochs", type=int, help="Passes over the rows (default 50 with --init, 1 otherwise)")
+    parser.add_argument("--alpha", type=float, default=0.0001, help="SGDClassifier regularization for a new model")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--random-state", type=int, default=42)
+    args = parser.parse_args()
+
+    epochs = args.epochs or (50 if args.init else 1)
+    paths = sorted({path for pattern in args.data for path in (glob.glob(pattern) or [pattern])})
+    output = args.output or args.model
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if args.init:
+            model_data = new_model_data(joblib.load(args.base), args.alpha, args.random_state)
+        else:
+            model_data = joblib.load(args.model)
+    if "incremental" not in model_data:
+        parser.error(f"{args.model} was not written by incremental.py; start one with --init")
+
+    start = time.time()
+    rows = skipped = 0
+    correct_before = checked_before = 0
+    for epoch in range(epochs):
+        for path in paths:
+            for chunk in iter_symptom_csv(path, chunksize=args.chunksize):
+                if 'Schizophrenia' not in chunk:
+                    print(f"Skipping {path}: it has no Schizophrenia labels")
+                    break
+                X, y, chunk_skipped = encode_rows(chunk, model_data)
+                if epoch == 0:
+                    skipped += chunk_skipped
+                if not len(y):
+                    continue
+                # The scaler sees each row once; later epochs only refine the model
+                accuracy = partial_fit(model_data, X, y, learn_scaling=epoch == 0)
+                if epoch == 0:
+                    rows += len(y)
+                    if accuracy is not None:
+                        correct_before += accuracy * len(y)
+                        checked_before += len(y)
+    seconds = time.time() - start
+
+    if not rows:
+        print("No usable labelled rows; the model was not changed")
+        return
+    accuracy_before = correct_before / checked_before if checked_before else None
+    model_data["incremental"]["updates"].append({
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "files": paths,
+        "rows": rows,
+        "skipped": skipped,
+        "epochs": epochs,
+        "accuracy_before_update": accuracy_before,
+        "seconds": seconds,
+    })
+    save_model_data(model_data, output)
+
+    total = int(model_data["incremental"]["class_counts"].sum())
+    print(f"Learned from {rows} rows ({skipped} skipped) in {seconds:.2f}s; {total} rows seen in total")
+    if accuracy_before is not None:
+        print(f"Accuracy on the new rows before the update: {accuracy_before * 100:.2f}%")
+    print(f"Model and preprocessing objects saved to {output}; deploy with MODEL_PATH={os.path.basename(output)}")
+
+
+if __name__ == "__main__":
+    main()
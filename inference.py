@@ -0,0 +1,389 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+FEATURE_COLUMNS = ['Gender', 'Marital_Status', 'Fatigue', 'Slowing', 'Pain', 'Hygiene', 'Movement']
+
+
+class SklearnPipeline:
+    """
+    Reference inference path: the fitted encoders, scaler and model from
+    model.pkl, called exactly the way the training notebooks call them.
+    """
+
+    def __init__(self, model_data):
+        self.model = model_data["model"]
+        self.scaler = model_data["scaler"]
+        self.le_gender = model_data["le_gender"]
+        self.le_marital_status = model_data["le_marital_status"]
+        self.le_schizophrenia = model_data["le_schizophrenia"]
+        self.gender_classes = list(self.le_gender.classes_)
+        self.marital_status_classes = list(self.le_marital_status.classes_)
+
+    def encode(self, gender, marital_status):
+        return (self.le_gender.transform([gender])[0],
+                self.le_marital_status.transform([marital_status])[0])
+
+    def predict_encoded(self, features):
+        """Predicts stage labels for an (n, 7) array of encoded, unscaled features."""
+        import pandas as pd
+        features = pd.DataFrame(np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS)),
+                                columns=FEATURE_COLUMNS)
+        prediction = self.model.predict(self.scaler.transform(features))
+        return self.le_schizophrenia.inverse_transform(prediction)
+
+    def predict_one(self, features):
+        return self.predict_encoded([features])[0]
+
+
+def svc_components(model_data):
+    """
+    Pulls everything inference needs out of a model.pkl dict holding a fitted
+    SVC: plain NumPy arrays plus a few scalars and label lists. Everything
+    derived from the fitted arrays (the per-pair coefficients and support
+    vector norms) is computed here, so CompiledSVCPipeline uses the arrays
+    as given and memory-mapped ones are never copied. Raises ValueError for
+    models the compiled path does not support.
+    """
+    model = model_data["model"]
+    scaler = model_data["scaler"]
+    if type(model).__name__ != "SVC" or model.kernel not in ("rbf", "linear"):
+        raise ValueError(f"Cannot compile {model!r}; only SVC with an rbf or linear kernel is supported")
+    support_vectors = np.ascontiguousarray(model.support_vectors_, dtype=np.float64)
+    n_classes = len(model.classes_)
+
+    # One row of coefficients per one-vs-one pair, so every decision value
+    # is a single matrix product with the kernel row
+    dual_coef = np.asarray(model.dual_coef_, dtype=np.float64)
+    starts = np.concatenate([[0], np.cumsum(model.n_support_)])
+    pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+    pair_coef = np.zeros((len(pairs), len(support_vectors)))
+    for p, (i, j) in enumerate(pairs):
+        pair_coef[p, starts[i]:starts[i + 1]] = dual_coef[j - 1, starts[i]:starts[i + 1]]
+        pair_coef[p, starts[j]:starts[j + 1]] = dual_coef[i, starts[j]:starts[j + 1]]
+    return {
+        "kernel": model.kernel,
+        "gamma": float(model._gamma),
+        # Model class index -> decoded stage label
+        "labels": [str(label) for label in np.asarray(model_data["le_schizophrenia"].classes_)[model.classes_]],
+        "gender_classes": [str(label) for label in model_data["le_gender"].classes_],
+        "marital_status_classes": [str(label) for label in model_data["le_marital_status"].classes_],
+        "feature_columns": list(model_data.get("feature_columns", FEATURE_COLUMNS)),
+        "support_vectors": support_vectors,
+        "support_vector_norms": np.einsum('sf,sf->s', support_vectors, support_vectors),
+        "pair_coef": pair_coef,
+        "pair_intercept": np.asarray(model.intercept_, dtype=np.float64),
+        "pair_first": np.array([i for i, _ in pairs], dtype=np.int64),
+        "pair_second": np.array([j for _, j in pairs], dtype=np.int64),
+        "mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "scale": np.asarray(scaler.scale_, dtype=np.float64),
+    }
+
+
+class _CompiledEncoders:
+    """Dict-based replacements for the fitted LabelEncoders."""
+
+    def _set_encoders(self, gender_classes, marital_status_classes, labels):
+        self.gender_classes = list(gender_classes)
+        self.marital_status_classes = list(marital_status_classes)
+        self.gender_codes = {label: code for code, label in enumerate(self.gender_classes)}
+        self.marital_status_codes = {label: code for code, label in enumerate(self.marital_status_classes)}
+        # Model class index -> decoded stage label
+        self.labels = np.asarray(labels, dtype=object)
+
+    def encode(self, gender, marital_status):
+        try:
+            return self.gender_codes[gender], self.marital_status_codes[marital_status]
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}") from None
+
+
+class CompiledSVCPipeline(_CompiledEncoders):
+    """
+    Fast inference path for the deployed SVC, built once from the model.pkl
+    artifacts (see `svc_components`). Encoders become dict lookups, and the
+    scaler, kernel and one-vs-one vote run as a handful of NumPy operations on
+    precomputed arrays without any sklearn input validation. Predictions
+    follow libsvm's rules exactly: class i wins pair (i, j) when the pair's
+    decision value is positive, and ties in the vote go to the lowest class
+    index. The large arrays are used as given, so memory-mapped ones stay
+    shared between processes.
+    """
+
+    def __init__(self, components):
+        self._set_encoders(components["gender_classes"], components["marital_status_classes"], components["labels"])
+
+        self.kernel = components["kernel"]
+        self.gamma = float(components["gamma"])
+        self.n_classes = len(self.labels)
+        self.mean = components["mean"]
+        self.scale = components["scale"]
+        self.support_vectors = components["support_vectors"]
+        self.support_vector_norms = components["support_vector_norms"]
+        self.pair_coef = components["pair_coef"]
+        self.pair_intercept = components["pair_intercept"]
+        self.pair_first = components["pair_first"]
+        self.pair_second = components["pair_second"]
+
+    def _kernel(self, scaled):
+        products = scaled @ self.support_vectors.T
+        if self.kernel == "linear":
+            return products
+        # Same expansion as libsvm: |x - sv|^2 = x.x + sv.sv - 2 x.sv
+        norms = np.einsum('nf,nf->n', scaled, scaled)
+        return np.exp(-self.gamma * (norms[:, None] + self.support_vector_norms - 2.0 * products))
+
+    def decision_values(self, features):
+        """One-vs-one decision values, shape (n, n_pairs), as SVC.decision_function(..., 'ovo')."""
+        scaled = (np.asarray(features, dtype=np.float64).reshape(-1, len(self.mean)) - self.mean) / self.scale
+        return self._kernel(scaled) @ self.pair_coef.T + self.pair_intercept
+
+    def predict_encoded(self, features):
+        """Predicts stage labels for an (n, 7) array of encoded, unscaled features."""
+        decision = self.decision_values(features)
+        winners = np.where(decision > 0, self.pair_first, self.pair_second)
+        votes = np.zeros((len(winners), self.n_classes), dtype=np.int64)
+        for c in range(self.n_classes):
+            votes[:, c] = (winners == c).sum(axis=1)
+        return self.labels[votes.argmax(axis=1)]
+
+    def predict_one(self, features):
+        scaled = (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+        kernel_row = self.support_vectors @ scaled
+        if self.kernel == "rbf":
+            kernel_row = np.exp(-self.gamma * (scaled @ scaled + self.support_vector_norms - 2.0 * kernel_row))
+        decision = self.pair_coef @ kernel_row + self.pair_intercept
+        votes = np.bincount(np.where(decision > 0, self.pair_first, self.pair_second), minlength=self.n_classes)
+        return self.labels[votes.argmax()]
+
+
+class CompiledKernelApproximationPipeline(_CompiledEncoders):
+    """
+    Fast inference path for the approximate models built by approximate.py:
+    a Nystroem or RBFSampler feature map followed by a one-vs-rest linear
+    classifier. Cost per row is fixed by the number of components instead of
+    growing with the SVC's support vectors.
+    """
+
+    def __init__(self, model_data):
+        model = model_data["model"]
+        steps = getattr(model, "named_steps", {})
+        feature_map, classifier = (list(steps.values()) + [None, None])[:2]
+        map_type = type(feature_map).__name__
+        if len(steps) != 2 or map_type not in ("Nystroem", "RBFSampler") or not hasattr(classifier, "coef_"):
+            raise ValueError(f"Cannot compile {model!r}; expected a kernel approximation followed by a linear model")
+        if len(classifier.classes_) < 3:
+            raise ValueError("Binary linear models are not supported")
+
+        self._set_encoders(model_data["le_gender"].classes_, model_data["le_marital_status"].classes_,
+                           [str(label) for label in np.asarray(model_data["le_schizophrenia"].classes_)[classifier.classes_]])
+        scaler = model_data["scaler"]
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.method = map_type
+        if map_type == "Nystroem":
+            if feature_map.kernel != "rbf":
+                raise ValueError("Only the rbf Nystroem kernel is supported")
+            self.gamma = float(feature_map.gamma)
+            self.components = np.asarray(feature_map.components_, dtype=np.float64)
+            self.component_norms = np.einsum('cf,cf->c', self.components, self.components)
+            # Fold the Nystroem normalization into the linear weights
+            self.weights = np.asarray(feature_map.normalization_).T @ np.asarray(classifier.coef_).T
+        else:
+            self.projection = np.asarray(feature_map.random_weights_, dtype=np.float64)
+            self.offset = np.asarray(feature_map.random_offset_, dtype=np.float64)
+            self.weights = np.sqrt(2.0 / len(self.offset)) * np.asarray(classifier.coef_).T
+        self.intercept = np.asarray(classifier.intercept_, dtype=np.float64)
+
+    def decision_values(self, features):
+        scaled = (np.asarray(features, dtype=np.float64).reshape(-1, len(self.mean)) - self.mean) / self.scale
+        if self.method == "Nystroem":
+            norms = np.einsum('nf,nf->n', scaled, scaled)
+            embedded = np.exp(-self.gamma * (norms[:, None] + self.component_norms - 2.0 * scaled @ self.components.T))
+        else:
+            embedded = np.cos(scaled @ self.projection + self.offset)
+        return embedded @ self.weights + self.intercept
+
+    def predict_encoded(self, features):
+        """Predicts stage labels for an (n, 7) array of encoded, unscaled features."""
+        return self.labels[self.decision_values(features).argmax(axis=1)]
+
+    def predict_one(self, features):
+        return self.predict_encoded(features)[0]
+
+
+class CompiledLinearPipeline(_CompiledEncoders):
+    """
+    Fast inference path for multiclass linear models such as the
+    SGDClassifier trained by incremental.py: scaling followed by one matrix
+    product and an argmax over the one-vs-rest scores.
+    """
+
+    def __init__(self, model_data):
+        model = model_data["model"]
+        if not hasattr(model, "coef_"):
+            raise ValueError(f"Cannot compile {model!r}; expected a linear model")
+        if len(model.classes_) < 3:
+            raise ValueError("Binary linear models are not supported")
+
+        self._set_encoders(model_data["le_gender"].classes_, model_data["le_marital_status"].classes_,
+                           [str(label) for label in np.asarray(model_data["le_schizophrenia"].classes_)[model.classes_]])
+        scaler = model_data["scaler"]
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.weights = np.asarray(model.coef_, dtype=np.float64).T
+        self.intercept = np.asarray(model.intercept_, dtype=np.float64)
+
+    def decision_values(self, features):
+        scaled = (np.asarray(features, dtype=np.float64).reshape(-1, len(self.mean)) - self.mean) / self.scale
+        return scaled @ self.weights + self.intercept
+
+    def predict_encoded(self, features):
+        """Predicts stage labels for an (n, 7) array of encoded, unscaled features."""
+        return self.labels[self.decision_values(features).argmax(axis=1)]
+
+    def predict_one(self, features):
+        return self.predict_encoded(features)[0]
+
+
+def compile_pipeline(model_data):
+    """
+    Returns the fastest available pipeline for the loaded model.pkl dict:
+    a compiled path for the SVC, for an approximate model from
+    approximate.py or for a linear model from incremental.py, the sklearn
+    objects otherwise.
+    """
+    try:
+        model = model_data["model"]
+        if hasattr(model, "named_steps"):
+            return CompiledKernelApproximationPipeline(model_data)
+        if type(model).__name__ != "SVC" and hasattr(model, "coef_"):
+            return CompiledLinearPipeline(model_data)
+        return CompiledSVCPipeline(svc_components(model_data))
+    except ValueError as e:
+        print(f"Using sklearn inference path: {e}")
+        return SklearnPipeline(model_data)
+
+
+# SCALING FUNCTION: Convert 0-10 input to model's expected range
+def scale_input_0_to_10(value):
+    """
+    Converts user input (0-10 scale) to model's expected range (-0.1 to 1.1)
+    This maps: 0 -> 0.0, 5 -> 0.5, 10 -> 1.0
+    """
+    return value / 10.0
+
+
+def scale_symptoms(fatigue, slowing, pain, hygiene, movement):
+    """Scales 0-10 symptom inputs to the model's range, rounded to 4 decimals so they work as cache keys."""
+    return tuple(round(scale_input_0_to_10(value), 4) for value in (fatigue, slowing, pain, hygiene, movement))
+
+
+def encode_input(pipeline, gender, marital_status, fatigue, slowing, pain, hygiene, movement):
+    """
+    Turns one dashboard input (symptoms on the 0-10 scale) into the encoded
+    feature tuple, in the EXACT order the model expects (NO AGE!). Raises
+    ValueError for an unknown gender or marital status.
+    """
+    return pipeline.encode(gender, marital_status) + scale_symptoms(fatigue, slowing, pain, hygiene, movement)
+
+
+# Batch scoring of whole DataFrames in the SchizophreniaSymptomnsData.csv layout
+BATCH_CHUNK_SIZE = 10000
+
+
+def encode_categorical(values, classes):
+    """
+    Vectorized LabelEncoder.transform: looks every value up in the encoder's
+    classes at once and returns -1 for unseen labels instead of raising.
+    """
+    import pandas as pd
+    lookup = pd.Index(classes)
+    return lookup.get_indexer(pd.Series(values, dtype=object).str.strip())
+
+
+def predict_frame(pipeline, data, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Scores every row of `data` (symptoms already on the model's 0-1 scale)
+    through `pipeline`, `chunk_size` rows at a time, and returns the predicted
+    stages as an array of strings. Rows with unknown categories or missing
+    symptom scores are marked "Error in Prediction".
+    """
+    import pandas as pd
+    data = data.rename(columns=lambda c: str(c).strip())
+    n_rows = len(data)
+    predicted = np.full(n_rows, "Error in Prediction", dtype=object)
+    if n_rows == 0:
+        return predicted
+
+    features = np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=np.float64)
+    features[:, 0] = encode_categorical(data['Gender'], pipeline.gender_classes)
+    features[:, 1] = encode_categorical(data['Marital_Status'], pipeline.marital_status_classes)
+    symptoms = data[FEATURE_COLUMNS[2:]].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    features[:, 2:] = np.round(symptoms, 4)
+
+    valid = (features[:, 0] >= 0) & (features[:, 1] >= 0) & ~np.isnan(symptoms).any(axis=1)
+    features = features[valid]
+
+    labels = np.empty(len(features), dtype=object)
+    for start in range(0, len(features), chunk_size):
+        chunk = features[start:start + chunk_size]
+        labels[start:start + len(chunk)] = pipeline.predict_encoded(chunk)
+    predicted[valid] = labels
+    return predicted
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of predictions keyed on the encoded, rounded feature
+    tuple. `clear()` starts a new generation; results computed against an
+    older generation (i.e. an older model) are not stored. A maxsize of 0
+    disables caching.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
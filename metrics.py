@@ -0,0 +1,284 @@
+"""
+Lightweight instrumentation: counters, latency histograms and gauges, plus
+Prometheus text rendering for the /metrics route.
+
+With METRICS_ENABLED=0 timers return a shared no-op context manager,
+counters return immediately and `instrument_callback` hands back the
+undecorated function, so disabled instrumentation costs one attribute check.
+
+Setting PROFILE_SLOW_CALLBACKS_MS turns on the slow-callback profiler. A
+PROFILE_SAMPLE_RATE fraction of instrumented callback calls runs under
+cProfile, or pyinstrument with PROFILER=pyinstrument. Calls slower than the
+threshold have their profile written to PROFILE_DIR. Only one call is
+profiled at a time.
+"""
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+PROFILE_SLOW_CALLBACKS_MS = float(os.environ.get("PROFILE_SLOW_CALLBACKS_MS", 0))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 1.0))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(".cache", "profiles"))
+PROFILER = os.environ.get("PROFILER", "cprofile")
+
+# Seconds; covers ~10 us compiled predictions up to multi-second figure builds
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class _Timing:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Histogram:
+    """Latency histogram with Prometheus-style cumulative buckets."""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labels):
+        if not METRICS_ENABLED:
+            return
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def time(self, *labels):
+        """Context manager that observes the duration of its block."""
+        if not METRICS_ENABLED:
+            return NULL_TIMER
+        return _Timing(self, labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, ([*counts], total, n)) for labels, (counts, total, n) in self._series.items())
+        for labels, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {n}")
+        return lines
+
+
+class Gauge:
+    """Value read from `function` at scrape time; it returns a number or {label value: number}."""
+
+    type = "gauge"
+
+    def __init__(self, name, help, function, labelname=None):
+        self.name = name
+        self.help = help
+        self.function = function
+        self.labelname = labelname
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        try:
+            value = self.function()
+        except Exception as e:
+            print(f"Could not read {self.type} {self.name}: {e}")
+            return []
+        if isinstance(value, dict):
+            for label, item in sorted(value.items()):
+                lines.append(f"{self.name}{_format_labels([self.labelname], [label])} {item}")
+        elif value is not None:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+class CallbackCounter(Gauge):
+    """Counter kept by another object (e.g. cache hits), read from `function` at scrape time."""
+
+    type = "counter"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "schizophrenia_stage_seconds", "Time spent in each hot-path stage", ["stage"]))
+PREDICTIONS = REGISTRY.register(Counter(
+    "schizophrenia_predictions_total", "Predictions made, by predicted stage and path", ["level", "path"]))
+PREDICTION_ERRORS = REGISTRY.register(Counter(
+    "schizophrenia_prediction_errors_total", "Predictions that failed, by exception type", ["error"]))
+CALLBACK_SECONDS = REGISTRY.register(Histogram(
+    "dash_callback_seconds", "Dash callback duration", ["callback"]))
+SLOW_CALLBACK_PROFILES = REGISTRY.register(Counter(
+    "dash_slow_callback_profiles_total", "Profiles written for slow callbacks", ["callback"]))
+
+
+def stage_timer(stage):
+    """Times one hot-path stage: `with stage_timer("predict"): ...`"""
+    if not METRICS_ENABLED:
+        return NULL_TIMER
+    return _Timing(STAGE_SECONDS, (stage,))
+
+
+# Slow-callback profiling
+_profile_lock = threading.Lock()
+
+
+def _start_profiler():
+    if PROFILER == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            pass
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler):
+    if type(profiler).__module__.startswith("pyinstrument"):
+        profiler.stop()
+    else:
+        profiler.disable()
+
+
+def _dump_profile(profiler, name, seconds):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{int(seconds * 1000)}ms")
+    if type(profiler).__module__.startswith("pyinstrument"):
+        path = stem + ".html"
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        path = stem + ".prof"
+        profiler.dump_stats(path)
+    SLOW_CALLBACK_PROFILES.inc(name)
+    print(f"Slow callback {name} took {seconds * 1000:.0f} ms; profile written to {path}")
+
+
+def instrument_callback(function):
+    """
+    Times a Dash callback into dash_callback_seconds and, when profiling is
+    on, profiles sampled calls and keeps the slow ones. Goes below
+    @app.callback.
+    """
+    profiling = PROFILE_SLOW_CALLBACKS_MS > 0
+    if not METRICS_ENABLED and not profiling:
+        return function
+    name = function.__name__
+    threshold = PROFILE_SLOW_CALLBACKS_MS / 1000
+
+    @wraps(function)
+    def wrapped(*args, **kwargs):
+        profiler = None
+        if profiling and random.random() < PROFILE_SAMPLE_RATE and _profile_lock.acquire(blocking=False):
+            try:
+                profiler = _start_profiler()
+            except Exception as e:
+                _profile_lock.release()
+                print(f"Could not start profiler: {e}")
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            CALLBACK_SECONDS.observe(seconds, name)
+            if profiler is not None:
+                try:
+                    _stop_profiler(profiler)
+                    if seconds >= threshold:
+                        _dump_profile(profiler, name, seconds)
+                except Exception as e:
+                    print(f"Could not write profile for {name}: {e}")
+                finally:
+                    _profile_lock.release()
+
+    return wrapped
@@ -0,0 +1,158 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Column layout of SchizophreniaSymptomnsData.csv, plus the dtype each column is stored as
+PATIENT_COLUMNS = {
+    "Name": object,
+    "Age": np.float64,
+    "Gender": object,
+    "Marital_Status": object,
+    "Fatigue": np.float64,
+    "Slowing": np.float64,
+    "Pain": np.float64,
+    "Hygiene": np.float64,
+    "Movement": np.float64,
+    "Schizophrenia": object,
+}
+
+
+class PatientStore:
+    """
+    In-process patient table backed by preallocated columnar NumPy arrays.
+
+    Appends are amortized O(1): the arrays double in size when full instead of
+    being copied on every insert like `pd.concat`. Rows are kept in a ring
+    buffer, so once `max_rows` is reached the oldest rows are overwritten, and
+    rows older than `max_age` seconds are dropped on the next write. Every row
+    gets a stable, increasing row id. All access goes through one lock, so the
+    store can be shared between Flask worker threads.
+    """
+
+    def __init__(self, max_rows=None, max_age=None, initial_capacity=1024):
+        if max_rows is not None and max_rows <= 0:
+            raise ValueError("max_rows must be a positive integer or None")
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        capacity = initial_capacity if max_rows is None else min(initial_capacity, max_rows)
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity):
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in PATIENT_COLUMNS.items()}
+        self._row_ids = np.empty(capacity, dtype=np.int64)
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._capacity = capacity
+        self._head = 0
+        self._size = 0
+        self._next_id = getattr(self, "_next_id", 0)
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
+    def _order(self):
+        # Physical positions of the live rows, oldest first
+        return (self._head + np.arange(self._size)) % self._capacity
+
+    def _grow(self, needed):
+        new_capacity = self._capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        if self.max_rows is not None:
+            new_capacity = min(new_capacity, self.max_rows)
+        if new_capacity == self._capacity:
+            return
+        order = self._order()
+        for name, dtype in PATIENT_COLUMNS.items():
+            column = np.empty(new_capacity, dtype=dtype)
+            column[:self._size] = self._columns[name][order]
+            self._columns[name] = column
+        row_ids = np.empty(new_capacity, dtype=np.int64)
+        row_ids[:self._size] = self._row_ids[order]
+        timestamps = np.empty(new_capacity, dtype=np.float64)
+        timestamps[:self._size] = self._timestamps[order]
+        self._row_ids, self._timestamps = row_ids, timestamps
+        self._capacity = new_capacity
+        self._head = 0
+
+    def _evict_expired(self, now):
+        if self.max_age is None or self._size == 0:
+            return
+        # Timestamps increase with insertion order, so expired rows are a prefix
+        ages = self._timestamps[self._order()]
+        expired = int(np.searchsorted(ages, now - self.max_age, side="left"))
+        self._head = (self._head + expired) % self._capacity
+        self._size -= expired
+
+    def extend(self, data):
+        """
+        Appends every row of `data` (a DataFrame or a list of dicts in the
+        patient column layout) and returns the new row ids.
+        """
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame.from_records(data)
+        n_rows = len(data)
+        with self._lock:
+            now = time.time()
+            self._evict_expired(now)
+            if self.max_rows is not None and n_rows > self.max_rows:
+                # Only the newest max_rows rows would survive anyway
+                data = data.iloc[n_rows - self.max_rows:]
+                self._next_id += n_rows - self.max_rows
+                n_rows = self.max_rows
+            self._grow(self._size + n_rows)
+
+            positions = (self._head + self._size + np.arange(n_rows)) % self._capacity
+            for name, dtype in PATIENT_COLUMNS.items():
+                if name in data.columns:
+                    values = data[name].to_numpy()
+                    if dtype is not object:
+                        values = pd.to_numeric(values, errors="coerce")
+                    self._columns[name][positions] = values
+                else:
+                    self._columns[name][positions] = np.nan if dtype is not object else None
+            row_ids = np.arange(self._next_id, self._next_id + n_rows, dtype=np.int64)
+            self._row_ids[positions] = row_ids
+            self._timestamps[positions] = now
+            self._next_id += n_rows
+
+            overflow = self._size + n_rows - self._capacity
+            if overflow > 0:
+                # Ring buffer is full: the oldest rows were overwritten
+                self._head = (self._head + overflow) % self._capacity
+                self._size = self._capacity
+            else:
+                self._size += n_rows
+            return row_ids
+
+    def append(self, record):
+        """Appends one patient record (a dict) and returns its row id."""
+        return int(self.extend([record])[0])
+
+    def get(self, row_id):
+        """Returns the record with the given row id as a dict, or None if it was evicted."""
+        with self._lock:
+            order = self._order()
+            index = int(np.searchsorted(self._row_ids[order], row_id))
+            if index >= self._size or self._row_ids[order[index]] != row_id:
+                return None
+            position = order[index]
+            record = {name: self._columns[name][position] for name in PATIENT_COLUMNS}
+            record["Row_Id"] = int(row_id)
+            return record
+
+    def to_frame(self):
+        """Returns a snapshot of the live rows, oldest first, as a DataFrame."""
+        with self._lock:
+            order = self._order()
+            frame = pd.DataFrame({name: self._columns[name][order] for name in PATIENT_COLUMNS})
+            frame["Row_Id"] = self._row_ids[order]
+            return frame
+
+    def clear(self):
+        with self._lock:
+            self._allocate(self._capacity)
@@ -0,0 +1,12 @@
+# Precautions for each predicted stage
+PRECAUTIONS = {
+    "Elevated Proneness": "Regular checkups, meditation, moderate physical activity.",
+    "Very High Proneness": "Immediate medical attention, medication as prescribed, high supervision, 8-9 hours of sleep.",
+    "High Proneness": "Monitor closely, engage in therapy sessions, ensure proper sleep (7-8 hours), avoid stress.",
+    "Low Proneness": "Light physical activity, engage in mindfulness practices, adequate sleep (7-8 hours).",
+    "Moderate Proneness": "Engage in group therapy, maintain a routine, avoid stress, 7-8 hours of sleep."
+}
+
+
+def get_precautions(level):
+    return PRECAUTIONS.get(level, "No precautions available.")
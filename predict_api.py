@@ -0,0 +1,324 @@
+"""
+Asynchronous prediction API for intake systems.
+
+PredictionAPI is a plain ASGI application, so any ASGI server can host it
+(`uvicorn --factory predict_api:create_app`). Running this file starts a
+small built-in asyncio HTTP/1.1 server instead, with no extra dependencies:
+
+    python predict_api.py --port 8060
+
+    POST /predict  {"gender": "Male", "marital_status": "Single", "fatigue": 7,
+                    "slowing": 3, "pain": 5, "hygiene": 2, "movement": 4}
+    GET  /ready
+    GET  /stats
+
+Inputs use the dashboard's 0-10 symptom scale and go through the same
+encode_input preprocessing and PredictionCache as the dashboard. Identical
+requests that arrive while one is still being scored share its result
+instead of queueing again. New requests wait in a bounded queue, and when it
+is full the API answers 429 straight away. One batching task drains the
+queue and scores each batch on a worker thread, so the event loop keeps
+serving connections while the model runs.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+
+import numpy as np
+
+from artifacts import load_pipeline
+from inference import encode_input, PredictionCache
+from precautions import get_precautions
+
+
+API_QUEUE_SIZE = int(os.environ.get("API_QUEUE_SIZE", 1024))
+API_MAX_BATCH_SIZE = int(os.environ.get("API_MAX_BATCH_SIZE", 256))
+API_MAX_BODY_BYTES = int(os.environ.get("API_MAX_BODY_BYTES", 65536))
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 4096))
+INPUT_FIELDS = ['gender', 'marital_status', 'fatigue', 'slowing', 'pain', 'hygiene', 'movement']
+
+
+class QueueFull(Exception):
+    pass
+
+
+def parse_input(payload):
+    """Validates one request body; keys may use the CSV spelling (Marital_Status)."""
+    if not isinstance(payload, dict):
+        raise ValueError("Expected a JSON object")
+    values = {str(key).strip().lower(): value for key, value in payload.items()}
+    missing = [field for field in INPUT_FIELDS if values.get(field) is None]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    symptoms = []
+    for field in INPUT_FIELDS[2:]:
+        try:
+            value = float(values[field])
+        except (TypeError, ValueError):
+            value = float("nan")
+        if not math.isfinite(value):
+            raise ValueError(f"{field} must be a number on the 0-10 scale")
+        symptoms.append(value)
+    return str(values['gender']).strip(), str(values['marital_status']).strip(), symptoms
+
+
+class PredictionAPI:
+    def __init__(self, pipeline, queue_size=API_QUEUE_SIZE, max_batch_size=API_MAX_BATCH_SIZE,
+                 cache_size=PREDICTION_CACHE_SIZE):
+        self.pipeline = pipeline
+        self.queue_size = queue_size
+        self.max_batch_size = max_batch_size
+        self.cache = PredictionCache(maxsize=cache_size)
+        self.in_flight = {}
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.batches = 0
+        self.rows = 0
+        self._queue = None
+        self._batcher = None
+
+    def _start(self):
+        if self._batcher is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            keys = [key for key, _ in batch]
+            self.batches += 1
+            self.rows += len(batch)
+            try:
+                labels = await loop.run_in_executor(None, self.pipeline.predict_encoded,
+                                                    np.array(keys, dtype=np.float64))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), label in zip(batch, labels):
+                if not future.done():
+                    future.set_result(str(label))
+
+    async def predict(self, key):
+        """Scores one encoded feature tuple: cache, then in-flight requests, then the queue."""
+        self._start()
+        predicted_stage = self.cache.get(key)
+        if predicted_stage is not None:
+            return predicted_stage
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((key, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull() from None
+        self.in_flight[key] = future
+        generation = self.cache.generation
+        try:
+            predicted_stage = await asyncio.shield(future)
+        finally:
+            self.in_flight.pop(key, None)
+        self.cache.put(key, predicted_stage, generation)
+        return predicted_stage
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "in_flight": len(self.in_flight),
+            "batches": self.batches,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "cache": self.cache.stats(),
+        }
+
+    async def handle(self, method, path, body):
+        """Returns (status, payload, extra headers) for one request."""
+        if path == "/ready" and method == "GET":
+            return 200, {"model_loaded": self.pipeline is not None}, []
+        if path == "/stats" and method == "GET":
+            return 200, self.stats(), []
+        if path != "/predict":
+            return 404, {"error": "Not found"}, []
+        if method != "POST":
+            return 405, {"error": "Use POST"}, [(b"allow", b"POST")]
+
+        self.requests += 1
+        try:
+            gender, marital_status, symptoms = parse_input(json.loads(body or b"null"))
+            key = encode_input(self.pipeline, gender, marital_status, *symptoms)
+        except ValueError as e:
+            return 400, {"error": str(e)}, []
+        try:
+            predicted_stage = await self.predict(key)
+        except QueueFull:
+            return 429, {"error": "Too many pending predictions, retry shortly"}, [(b"retry-after", b"1")]
+        except Exception as e:
+            print(f"Prediction error: {e}")
+            return 500, {"error": "Error in Prediction"}, []
+        return 200, {"Predicted_Schizophrenia": predicted_stage, "precautions": get_precautions(predicted_stage)}, []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    self._start()
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > API_MAX_BODY_BYTES:
+                status, payload, headers = 413, {"error": "Request body too large"}, []
+                break
+            if not message.get("more_body"):
+                status, payload, headers = await self.handle(scope["method"], scope["path"], body)
+                break
+        content = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"),
+                        (b"content-length", str(len(content)).encode())] + headers,
+        })
+        await send({"type": "http.response.body", "body": content})
+
+
+# Built-in HTTP/1.1 server: enough of the protocol for JSON clients, with keep-alive
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error", 501: "Not Implemented"}
+
+
+async def reject(writer, status, message):
+    """Answers a request the server cannot read and closes the connection, whose framing is now unknown."""
+    content = json.dumps({"error": message}).encode()
+    writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\ncontent-type: application/json\r\n"
+                 f"content-length: {len(content)}\r\nconnection: close\r\n\r\n".encode() + content)
+    await writer.drain()
+
+
+async def serve_connection(asgi_app, reader, writer):
+    peer = writer.get_extra_info("peername")
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = request_line.split(" ")
+            except ValueError:
+                return
+            headers = []
+            for line in header_lines:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+            header_map = dict(headers)
+            # Bodies are only read by Content-Length; anything else would desync keep-alive
+            transfer_encoding = header_map.get(b"transfer-encoding", b"").lower()
+            if transfer_encoding:
+                if b"chunked" in transfer_encoding:
+                    await reject(writer, 411, "Chunked request bodies are not supported; send a Content-Length")
+                else:
+                    await reject(writer, 501, "Unsupported Transfer-Encoding")
+                return
+            content_length = header_map.get(b"content-length", b"0")
+            if not content_length.isdigit():
+                await reject(writer, 400, "Invalid Content-Length")
+                return
+            length = int(content_length)
+            if length > API_MAX_BODY_BYTES:
+                await reject(writer, 413, "Request body too large")
+                return
+            body = await reader.readexactly(length) if length else b""
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": version.split("/")[-1],
+                "method": method.upper(),
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": peer[:2] if peer else None,
+                "server": writer.get_extra_info("sockname")[:2],
+            }
+            messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+            async def receive():
+                return messages.pop() if messages else {"type": "http.disconnect"}
+
+            response = []
+
+            async def send(message):
+                response.append(message)
+
+            await asgi_app(scope, receive, send)
+            start, chunks = response[0], [m.get("body", b"") for m in response[1:]]
+            keep_alive = header_map.get(b"connection", b"").lower() != b"close" and version == "HTTP/1.1"
+            status = start["status"]
+            lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}".encode()]
+            lines += [name + b": " + value for name, value in start["headers"]]
+            lines.append(b"connection: " + (b"keep-alive" if keep_alive else b"close"))
+            writer.write(b"\r\n".join(lines) + b"\r\n\r\n" + b"".join(chunks))
+            await writer.drain()
+            if not keep_alive:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(asgi_app, host, port, backlog):
+    server = await asyncio.start_server(lambda r, w: serve_connection(asgi_app, r, w), host, port, backlog=backlog)
+    print(f"Prediction API listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def create_app(model_file=None):
+    return PredictionAPI(load_pipeline(model_file or os.environ.get("MODEL_PATH", "model.pkl")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the asynchronous prediction API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8060)
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH", "model.pkl"),
+                        help="model.pkl file or model.artifact directory")
+    parser.add_argument("--backlog", type=int, default=4096, help="Pending connection backlog")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(create_app(args.model), args.host, args.port, args.backlog))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import queue
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+
+HISTORY_COLUMNS = ['timestamp', 'username', 'name', 'age', 'gender', 'marital_status',
+                   'fatigue', 'slowing', 'pain', 'hygiene', 'movement', 'predicted']
+# History column -> patient column (SchizophreniaSymptomnsData.csv layout)
+PATIENT_LAYOUT = {
+    'name': 'Name', 'age': 'Age', 'gender': 'Gender', 'marital_status': 'Marital_Status',
+    'fatigue': 'Fatigue', 'slowing': 'Slowing', 'pain': 'Pain', 'hygiene': 'Hygiene',
+    'movement': 'Movement', 'predicted': 'Schizophrenia',
+}
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS predictions (
+        id INTEGER PRIMARY KEY,
+        timestamp REAL NOT NULL,
+        username TEXT,
+        name TEXT,
+        age REAL,
+        gender TEXT,
+        marital_status TEXT,
+        fatigue REAL,
+        slowing REAL,
+        pain REAL,
+        hygiene REAL,
+        movement REAL,
+        predicted TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_username ON predictions (username, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_predicted ON predictions (predicted, timestamp)",
+]
+INSERT_PREDICTION = (f"INSERT INTO predictions ({', '.join(HISTORY_COLUMNS)}) "
+                     f"VALUES ({', '.join('?' * len(HISTORY_COLUMNS))})")
+
+
+class PredictionHistory:
+    """
+    Persistent log of dashboard predictions in SQLite (WAL mode), indexed on
+    timestamp, user and predicted class.
+
+    `record()` only puts the row on an in-memory queue, so callbacks never
+    wait for the disk. A writer thread commits queued rows in batches of up
+    to `batch_size`, at least every `flush_interval` seconds while rows are
+    pending. If the disk falls far enough behind that `max_pending` rows are
+    queued, new rows are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, path="predictions.db", batch_size=500, flush_interval=0.5, max_pending=100000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._read_lock = threading.Lock()
+        self._reader = None
+        self._writer = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def setup(self):
+        """Creates the table and indexes and starts the writer thread."""
+        conn = self._connect()
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        self._reader = conn
+        self._writer = threading.Thread(target=self._write_batches, name="prediction-history", daemon=True)
+        self._writer.start()
+
+    def record(self, record, username=None, timestamp=None):
+        """Queues one prediction (a patient record dict with Schizophrenia set) for writing."""
+        row = (timestamp or time.time(), username, *(record.get(PATIENT_LAYOUT[c]) for c in HISTORY_COLUMNS[2:]))
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _write_batches(self):
+        conn = self._connect()
+        while True:
+            rows = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    rows.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in rows
+            rows = [row for row in rows if row is not None]
+            try:
+                with conn:
+                    conn.executemany(INSERT_PREDICTION, rows)
+                self.written += len(rows)
+            except sqlite3.Error as e:
+                print(f"Error writing prediction history: {e}")
+            finally:
+                for _ in range(len(rows) + stop):
+                    self._queue.task_done()
+            if stop:
+                conn.close()
+                return
+
+    def flush(self):
+        """Blocks until every queued row is committed."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _query(self, where, params, limit, order_by):
+        sql = f"SELECT id, {', '.join(HISTORY_COLUMNS)} FROM predictions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = [*params, limit]
+        with self._read_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def page(self, limit=100, before=None, username=None, predicted=None, since=None):
+        """
+        One page of history, newest first, as a list of dicts. Pass the last
+        row's id as `before` to get the next page. Pages are ordered by id,
+        the same key as the cursor, so no row is skipped or repeated even
+        when timestamps arrive out of order.
+        """
+        where, params = [], []
+        if before is not None:
+            where.append("id < ?")
+            params.append(before)
+        if username is not None:
+            where.append("username = ?")
+            params.append(username)
+        if predicted is not None:
+            where.append("predicted = ?")
+            params.append(predicted)
+        if since is not None:
+            where.append("timestamp >= ?")
+            params.append(since)
+        rows = self._query(where, params, limit, "id DESC")
+        return [dict(zip(['id'] + HISTORY_COLUMNS, row)) for row in rows]
+
+    def recent(self, limit=None, since=None):
+        """
+        The newest `limit` predictions (optionally only those after `since`)
+        as a DataFrame in the patient layout, oldest first, for PatientStore.
+        """
+        where, params = ([], []) if since is None else (["timestamp >= ?"], [since])
+        rows = self._query(where, params, limit, "timestamp DESC, id DESC")[::-1]
+        frame = pd.DataFrame.from_records(rows, columns=['id'] + HISTORY_COLUMNS)
+        return frame.rename(columns=PATIENT_LAYOUT)[list(PATIENT_LAYOUT.values())]
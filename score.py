@@ -0,0 +1,119 @@
+"""
+Streaming scorer for intake files of any size.
+
+Reads padded CSVs in the SchizophreniaSymptomnsData*.csv layout (with or
+without the Schizophrenia column) CHUNK rows at a time, scores each chunk
+with the compiled pipeline, and appends Name, Predicted_Schizophrenia and
+precautions to a CSV or Parquet file. Only one chunk is held in memory at a
+time, whatever the size of the input:
+
+    python score.py regional_export.csv --output scored.parquet
+    python score.py "exports/*.csv" --output scored.csv --chunksize 200000
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+from artifacts import load_pipeline
+from data_loader import iter_symptom_csv
+from inference import predict_frame
+from precautions import get_precautions
+
+
+OUTPUT_COLUMNS = ['Name', 'Predicted_Schizophrenia', 'precautions']
+
+
+def score_chunk(pipeline, chunk):
+    predicted = pd.Series(predict_frame(pipeline, chunk), dtype=object)
+    precautions = predicted.map({level: get_precautions(level) for level in predicted.unique()})
+    return pd.DataFrame({
+        'Name': chunk['Name'].to_numpy(dtype=object),
+        'Predicted_Schizophrenia': predicted.to_numpy(),
+        'precautions': precautions.to_numpy(),
+    }, columns=OUTPUT_COLUMNS)
+
+
+class CSVWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes each chunk as its own row group of one Parquet file."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires the pyarrow package (pip install pyarrow)") from None
+        self.pa = pa
+        self.schema = pa.schema([(column, pa.string()) for column in OUTPUT_COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, frame):
+        self.writer.write_table(self.pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(path):
+    if path.endswith((".parquet", ".pq")):
+        return ParquetWriter(path)
+    return CSVWriter(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score large symptom CSVs chunk by chunk.")
+    parser.add_argument("inputs", nargs="+", help="CSV files or glob patterns in the SchizophreniaSymptomnsData layout")
+    parser.add_argument("--output", required=True, help="Output file; .parquet writes Parquet, anything else CSV")
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH", "model.pkl"),
+                        help="model.pkl file or model.artifact directory")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Rows read and scored at a time")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    args = parser.parse_args()
+
+    filepaths = [path for pattern in args.inputs for path in (sorted(glob.glob(pattern)) or [pattern])]
+    missing = [path for path in filepaths if not os.path.exists(path)]
+    if missing:
+        sys.exit(f"No such file: {', '.join(missing)}")
+
+    pipeline = load_pipeline(args.model)
+    writer = open_writer(args.output)
+    rows = 0
+    errors = 0
+    start = time.perf_counter()
+    try:
+        for filepath in filepaths:
+            for chunk in iter_symptom_csv(filepath, chunksize=args.chunksize):
+                scored = score_chunk(pipeline, chunk)
+                writer.write(scored)
+                rows += len(scored)
+                errors += int((scored['Predicted_Schizophrenia'] == "Error in Prediction").sum())
+                if not args.quiet:
+                    elapsed = time.perf_counter() - start
+                    print(f"{filepath}: {rows:,} rows scored, {rows / elapsed:,.0f} rows/s", flush=True)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows:,} rows from {len(filepaths)} file(s) in {elapsed:.2f}s "
+          f"({rows / elapsed if elapsed else 0:,.0f} rows/s); {errors:,} rows could not be scored")
+    print(f"Predictions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Multi-process scoring pool.
+
+Under the threaded Flask server the GIL serializes the kernel math, so
+predictions made on request threads share a single core. A ScoringPool runs
+the model in worker processes instead. Each worker loads the model file once.
+Web threads queue encoded feature rows and block only on their result. A
+dispatcher thread collects queued rows into micro-batches of up to
+`max_batch_size` rows, waiting at most `max_wait` seconds after the first one,
+and keeps at most one batch in flight per process. Rows arriving while every
+worker is busy are picked up by the next batch.
+
+Workers are forked once, when the pool is created, and never again: reload()
+swaps the model inside the running workers. Forking a process that already
+runs other threads can deadlock the child, so create the pool before the
+process starts any (app.py does so at import, before the history writer and
+the warm-up). forkserver and spawn are no alternative, since their workers
+re-import the parent's __main__, which for `python app.py` is the whole app.
+
+The pool costs a queue and a process hop per row, so it is slower than
+scoring inline when predictions are cheap: the compiled SVC scores ~125k
+rows/s inline on one core but ~11k rows/s through the pool. Measure with
+benchmarks/scoring_pool.py before turning it on.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+
+_pipeline = None
+_generation = 0
+
+
+def _load(model_file, generation):
+    """Loads `model_file` unless this worker already has it or a newer model."""
+    global _pipeline, _generation
+    if generation > _generation:
+        from artifacts import load_pipeline
+        _pipeline = load_pipeline(model_file)
+        _generation = generation
+    return os.getpid()
+
+
+def _score_batch(model_file, generation, features):
+    _load(model_file, generation)
+    return [str(label) for label in _pipeline.predict_encoded(features)]
+
+
+def _ping():
+    return os.getpid()
+
+
+class ScoringPool:
+    def __init__(self, model_file, processes, max_batch_size=256, max_wait=0.002):
+        """`model_file` may be None when the model is only known later; call reload() then."""
+        self.processes = processes
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        if threading.active_count() > 1:
+            print(f"ScoringPool created with {threading.active_count() - 1} other thread(s) running; "
+                  f"its forked workers may deadlock")
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self._executor = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+        # Start every worker now, before this pool's own dispatcher thread
+        for future in [self._executor.submit(_ping) for _ in range(processes)]:
+            future.result()
+        self._model = None
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(processes)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.queue_wait_total = 0.0
+        self.batch_size_histogram = {}
+        if model_file is not None:
+            self.reload(model_file)
+        self._dispatcher = threading.Thread(target=self._dispatch, name="scoring-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def reload(self, model_file):
+        """
+        Switches the workers to `model_file`. Batches queued from now on use
+        it; a worker loads it on its next task if the warm-up load below
+        went to another worker.
+        """
+        generation = self._model[1] + 1 if self._model else 1
+        # Idle workers each pick up one load, so requests rarely pay for it
+        for future in [self._executor.submit(_load, model_file, generation) for _ in range(self.processes)]:
+            future.result()
+        with self._lock:
+            self._model = (model_file, generation)
+
+    def submit(self, features):
+        """Queues one encoded feature row; returns a Future for its stage label."""
+        future = Future()
+        self._queue.put((features, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return future
+
+    def predict(self, features, timeout=None):
+        return self.submit(features).result(timeout)
+
+    def _collect(self):
+        """Blocks for the first queued row, then gathers more until the batch is full or the deadline passes."""
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return None
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _dispatch(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self._slots.acquire()
+            # Rows that queued up while every worker was busy join this batch
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            now = time.perf_counter()
+            size = len(batch)
+            with self._lock:
+                self.in_flight += 1
+            self.batches += 1
+            self.rows += size
+            self.queue_wait_total += sum(now - enqueued for _, _, enqueued in batch)
+            bucket = 1 << (size - 1).bit_length()
+            self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+
+            features = np.array([features for features, _, _ in batch], dtype=np.float64)
+            futures = [future for _, future, _ in batch]
+            try:
+                with self._lock:
+                    if self._model is None:
+                        raise RuntimeError("No model loaded; call reload() first")
+                    result = self._executor.submit(_score_batch, *self._model, features)
+            except Exception as e:
+                self._release()
+                self._fail(futures, e)
+                continue
+            result.add_done_callback(lambda done, futures=futures: self._deliver(done, futures))
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _deliver(self, done, futures):
+        self._release()
+        try:
+            labels = done.result()
+        except Exception as e:
+            self._fail(futures, e)
+            return
+        for future, label in zip(futures, labels):
+            future.set_result(label)
+
+    def _fail(self, futures, error):
+        self.errors += len(futures)
+        for future in futures:
+            future.set_exception(error)
+
+    def stats(self):
+        return {
+            "processes": self.processes,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight_batches": self.in_flight,
+            "batches": self.batches,
+            "rows": self.rows,
+            "errors": self.errors,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "mean_queue_wait_ms": self.queue_wait_total / self.rows * 1000 if self.rows else 0.0,
+            "batch_size_histogram": {str(k): v for k, v in sorted(self.batch_size_histogram.items())},
+        }
+
+    def close(self):
+        self._queue.put(None)
+        self._dispatcher.join()
+        with self._lock:
+            self._executor.shutdown()
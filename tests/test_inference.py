@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.svm import SVC
+
+from inference import (CompiledSVCPipeline, FEATURE_COLUMNS, PredictionCache, SklearnPipeline, compile_pipeline,
+                       predict_frame)
+
+
+STAGES = ["Elevated Proneness", "High Proneness", "Low Proneness", "Moderate Proneness", "Very High Proneness"]
+
+
+def make_features(rng, n_rows):
+    return np.column_stack([
+        rng.integers(0, 2, n_rows),
+        rng.integers(0, 4, n_rows),
+        rng.random((n_rows, 5)).round(2),
+    ]).astype(np.float64)
+
+
+def make_model_data(kernel="rbf", n_rows=400, seed=0):
+    """A model.pkl dict with a small SVC trained on synthetic rows."""
+    rng = np.random.default_rng(seed)
+    X = make_features(rng, n_rows)
+    # Stage from the symptom total, with some noise so the classes overlap
+    score = X[:, 2:].sum(axis=1) + rng.normal(0, 0.3, n_rows)
+    y = np.digitize(score, np.quantile(score, [0.2, 0.4, 0.6, 0.8]))
+
+    le_gender = LabelEncoder().fit(["Female", "Male"])
+    le_marital_status = LabelEncoder().fit(["Divorced", "Married", "Single", "Widowed"])
+    le_schizophrenia = LabelEncoder().fit(STAGES)
+    scaler = StandardScaler().fit(pd.DataFrame(X, columns=FEATURE_COLUMNS))
+    model = SVC(kernel=kernel, C=10, gamma=0.5).fit(scaler.transform(pd.DataFrame(X, columns=FEATURE_COLUMNS)), y)
+    return {
+        "model": model,
+        "scaler": scaler,
+        "le_gender": le_gender,
+        "le_marital_status": le_marital_status,
+        "le_schizophrenia": le_schizophrenia,
+        "feature_columns": list(FEATURE_COLUMNS),
+    }
+
+
+@pytest.mark.parametrize("kernel", ["rbf", "linear"])
+def test_compiled_svc_matches_sklearn(kernel):
+    model_data = make_model_data(kernel)
+    compiled = compile_pipeline(model_data)
+    reference = SklearnPipeline(model_data)
+    assert isinstance(compiled, CompiledSVCPipeline)
+
+    features = make_features(np.random.default_rng(1), 2000)
+    expected = reference.predict_encoded(features)
+    assert list(compiled.predict_encoded(features)) == list(expected)
+    assert [compiled.predict_one(row) for row in features[:200]] == list(expected[:200])
+
+
+def test_compiled_svc_breaks_vote_ties_like_libsvm():
+    model_data = make_model_data()
+    compiled = compile_pipeline(model_data)
+    reference = SklearnPipeline(model_data)
+
+    # Rows where two or more classes share the most one-vs-one wins
+    features = make_features(np.random.default_rng(2), 20000)
+    decision = compiled.decision_values(features)
+    winners = np.where(decision > 0, compiled.pair_first, compiled.pair_second)
+    votes = np.stack([(winners == c).sum(axis=1) for c in range(compiled.n_classes)], axis=1)
+    tied = (votes == votes.max(axis=1, keepdims=True)).sum(axis=1) > 1
+    assert tied.any()
+
+    tied_features = features[tied]
+    assert list(compiled.predict_encoded(tied_features)) == list(reference.predict_encoded(tied_features))
+    assert [compiled.predict_one(row) for row in tied_features] == list(reference.predict_encoded(tied_features))
+
+
+def test_unknown_categories_are_errors():
+    compiled = compile_pipeline(make_model_data())
+    with pytest.raises(ValueError):
+        compiled.encode("Other", "Single")
+
+    data = pd.DataFrame({
+        "Gender": ["Male", "Other", "Female", "Female"],
+        "Marital_Status": ["Single", "Single", "Engaged", "Married"],
+        "Fatigue": [0.5, 0.5, 0.5, None],
+        "Slowing": [0.5] * 4, "Pain": [0.5] * 4, "Hygiene": [0.5] * 4, "Movement": [0.5] * 4,
+    })
+    predicted = predict_frame(compiled, data)
+    assert predicted[0] in STAGES
+    assert list(predicted[1:]) == ["Error in Prediction"] * 3
+
+
+def test_prediction_cache_drops_results_from_an_older_generation():
+    cache = PredictionCache(maxsize=10)
+    generation = cache.generation
+    cache.put((1, 2), "Low Proneness", generation)
+    assert cache.get((1, 2)) == "Low Proneness"
+
+    # A model reload clears the cache; a prediction started before it must not be stored
+    cache.clear()
+    assert cache.get((1, 2)) is None
+    cache.put((3, 4), "High Proneness", generation)
+    assert cache.get((3, 4)) is None
+    cache.put((3, 4), "High Proneness", cache.generation)
+    assert cache.get((3, 4)) == "High Proneness"
+
+
+def test_prediction_cache_evicts_least_recently_used():
+    cache = PredictionCache(maxsize=2)
+    cache.put("a", "A", cache.generation)
+    cache.put("b", "B", cache.generation)
+    cache.get("a")
+    cache.put("c", "C", cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+    disabled = PredictionCache(maxsize=0)
+    disabled.put("a", "A", disabled.generation)
+    assert disabled.get("a") is None
@@ -0,0 +1,54 @@
+import pytest
+
+from prediction_history import PredictionHistory
+
+
+def make_record(name, predicted="Low Proneness"):
+    return {"Name": name, "Age": 40, "Gender": "Female", "Marital_Status": "Single", "Fatigue": 0.5,
+            "Slowing": 0.5, "Pain": 0.5, "Hygiene": 0.5, "Movement": 0.5, "Schizophrenia": predicted}
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = PredictionHistory(str(tmp_path / "predictions.db"), flush_interval=0.01)
+    history.setup()
+    yield history
+    history.close()
+
+
+def test_paging_visits_every_row_once_with_out_of_order_timestamps(history):
+    # Clock steps backwards and rows from slow clients arrive late
+    timestamps = [100, 105, 101, 110, 102, 109, 103, 108, 104, 107, 106, 99]
+    for i, timestamp in enumerate(timestamps):
+        history.record(make_record(f"patient {i}"), username="admin", timestamp=timestamp)
+    history.flush()
+
+    seen, before = [], None
+    while True:
+        rows = history.page(limit=5, before=before)
+        if not rows:
+            break
+        seen.extend(row["id"] for row in rows)
+        before = rows[-1]["id"]
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == len(set(seen)) == len(timestamps)
+
+
+def test_page_filters(history):
+    history.record(make_record("a"), username="admin", timestamp=100)
+    history.record(make_record("b", "High Proneness"), username="clinician", timestamp=200)
+    history.record(make_record("c"), username="clinician", timestamp=50)
+    history.flush()
+
+    assert [row["name"] for row in history.page(username="clinician")] == ["c", "b"]
+    assert [row["name"] for row in history.page(predicted="High Proneness")] == ["b"]
+    assert [row["name"] for row in history.page(since=100)] == ["b", "a"]
+
+
+def test_recent_returns_the_newest_rows_by_timestamp_oldest_first(history):
+    for name, timestamp in [("a", 300), ("b", 100), ("c", 200), ("d", 400)]:
+        history.record(make_record(name), timestamp=timestamp)
+    history.flush()
+
+    assert list(history.recent(limit=3)["Name"]) == ["c", "a", "d"]
+    assert list(history.recent(since=250)["Name"]) == ["a", "d"]
@@ -0,0 +1,176 @@
+"""
+Non-interactive training entry point.
+
+Loads and encodes the data once, applies SMOTE to the training split, then
+trains every requested algorithm in its own worker process. The workers read
+the shared feature arrays through memory-mapped .npy files. Each run writes
+versioned artifacts and a timing/metrics report to models/<version>/:
+
+    python train.py --algorithms svm random_forest xgboost --time-budget 600
+    python train.py --algorithms svm --no-search --promote
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from artifacts import export_artifact
+from data_loader import load_all_symptom_data
+from excel_export import write_colored_excel
+from training import ALGORITHMS, preprocess_data, save_model, train_model
+
+
+def _train_worker(algorithm, arrays_dir, artifacts, options):
+    """Trains one algorithm on the memory-mapped arrays and writes its artifacts."""
+    X_train = np.load(os.path.join(arrays_dir, "X_train.npy"), mmap_mode="r")
+    y_train = np.load(os.path.join(arrays_dir, "y_train.npy"), mmap_mode="r")
+    X_test = np.load(os.path.join(arrays_dir, "X_test.npy"), mmap_mode="r")
+    y_test = np.load(os.path.join(arrays_dir, "y_test.npy"), mmap_mode="r")
+
+    start = time.time()
+    model = train_model(X_train, y_train, algorithm=algorithm, search=options["search"],
+                        time_budget=options["time_budget"], n_jobs=options["n_jobs"], verbose=0)
+    train_seconds = time.time() - start
+
+    start = time.time()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.time() - start
+
+    le_schizophrenia = artifacts["le_schizophrenia"]
+    model_path = os.path.join(options["output_dir"], f"model-{algorithm}.pkl")
+    save_model(model, artifacts["scaler"], artifacts["le_gender"], artifacts["le_marital_status"],
+               le_schizophrenia, artifacts["feature_columns"], filename=model_path)
+
+    predictions = pd.DataFrame(np.asarray(X_test), columns=artifacts["feature_columns"])
+    predictions['Actual_Schizophrenia'] = le_schizophrenia.inverse_transform(np.asarray(y_test))
+    predictions['Predicted_Schizophrenia'] = le_schizophrenia.inverse_transform(np.asarray(y_pred).ravel())
+    predictions.to_csv(os.path.join(options["output_dir"], f"predictions-{algorithm}.csv"), index=False)
+    if options["excel"]:
+        write_colored_excel(predictions, os.path.join(options["output_dir"], f"predictions-{algorithm}.xlsx"),
+                            label_column='Predicted_Schizophrenia', sheet_name="Test Data")
+
+    return {
+        "algorithm": algorithm,
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "train_seconds": train_seconds,
+        "predict_seconds": predict_seconds,
+        "params": {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, bool, type(None)))},
+        "model_path": model_path,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and compare schizophrenia prediction models.")
+    parser.add_argument("--data", nargs="+", default=["SchizophreniaSymptomnsData.csv"],
+                        help="CSV files or glob patterns in the SchizophreniaSymptomnsData layout")
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument("--test-size", type=float, default=0.16)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--no-search", dest="search", action="store_false",
+                        help="Fit each algorithm with its default settings instead of searching")
+    parser.add_argument("--time-budget", type=float, help="Seconds each algorithm's search may take")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Total CPU cores to use")
+    parser.add_argument("--output-dir", default="models")
+    parser.add_argument("--version", help="Artifact version (defaults to a UTC timestamp)")
+    parser.add_argument("--excel", action="store_true",
+                        help="Also write each model's test predictions as an .xlsx colored by predicted level")
+    parser.add_argument("--promote", action="store_true",
+                        help="Copy the most accurate model to model.pkl for the dashboard")
+    args = parser.parse_args()
+
+    version = args.version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output_dir = os.path.join(args.output_dir, version)
+    os.makedirs(output_dir, exist_ok=True)
+    timings = {}
+
+    # Load, encode, split and oversample once for every algorithm
+    start = time.time()
+    frames = [load_all_symptom_data(pattern, dropna=True) for pattern in args.data]
+    data = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    timings["load_seconds"] = time.time() - start
+
+    start = time.time()
+    X, y, le_gender, le_marital_status, le_schizophrenia, scaler, feature_columns = preprocess_data(data)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=args.random_state)
+    from imblearn.over_sampling import SMOTE
+    X_train, y_train = SMOTE(random_state=args.random_state).fit_resample(X_train, y_train)
+    timings["preprocess_seconds"] = time.time() - start
+
+    arrays_dir = tempfile.mkdtemp(prefix="train-arrays-")
+    try:
+        for name, array in [("X_train", X_train), ("y_train", y_train), ("X_test", X_test), ("y_test", y_test)]:
+            np.save(os.path.join(arrays_dir, f"{name}.npy"), np.ascontiguousarray(np.asarray(array)))
+
+        artifacts = {
+            "scaler": scaler,
+            "le_gender": le_gender,
+            "le_marital_status": le_marital_status,
+            "le_schizophrenia": le_schizophrenia,
+            "feature_columns": feature_columns,
+        }
+        options = {
+            "search": args.search,
+            "time_budget": args.time_budget,
+            "n_jobs": max(1, args.jobs // len(args.algorithms)),
+            "output_dir": output_dir,
+            "excel": args.excel,
+        }
+
+        start = time.time()
+        with ProcessPoolExecutor(max_workers=min(len(args.algorithms), args.jobs)) as executor:
+            futures = [executor.submit(_train_worker, algorithm, arrays_dir, artifacts, options)
+                       for algorithm in args.algorithms]
+            results = [future.result() for future in futures]
+        timings["train_wall_seconds"] = time.time() - start
+    finally:
+        shutil.rmtree(arrays_dir, ignore_errors=True)
+
+    report = {
+        "version": version,
+        "data": sorted(path for pattern in args.data for path in glob.glob(pattern)),
+        "rows": len(data),
+        "train_rows": len(y_train),
+        "test_rows": len(y_test),
+        "test_size": args.test_size,
+        "random_state": args.random_state,
+        "search": args.search,
+        "timings": timings,
+        "results": results,
+    }
+    best = max(results, key=lambda r: r["accuracy"])
+    report["best_algorithm"] = best["algorithm"]
+    if args.promote:
+        shutil.copy(best["model_path"], "model.pkl")
+        report["promoted"] = best["model_path"]
+        try:
+            # Running dashboards hot-reload the memory-mapped copy
+            export_artifact(joblib.load("model.pkl"), "model.artifact", source="model.pkl")
+        except ValueError as e:
+            print(f"Not exporting a memory-mapped artifact: {e}")
+
+    with open(os.path.join(output_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nVersion {version}: {len(data)} rows loaded in {timings['load_seconds']:.2f}s, "
+          f"preprocessed in {timings['preprocess_seconds']:.2f}s")
+    for r in sorted(results, key=lambda r: r["accuracy"], reverse=True):
+        print(f"  {r['algorithm']:<14} accuracy {r['accuracy'] * 100:6.2f}%   train {r['train_seconds']:8.2f}s")
+    print(f"Total training wall time {timings['train_wall_seconds']:.2f}s; report written to "
+          f"{os.path.join(output_dir, 'report.json')}")
+    if args.promote:
+        print(f"Promoted {best['model_path']} to model.pkl")
+
+
+if __name__ == "__main__":
+    main()
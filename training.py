@@ -0,0 +1,171 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from data_loader import load_symptom_data, SYMPTOM_COLUMNS
+from excel_export import write_colored_excel
+from hyperparameter_search import SuccessiveHalvingSearch
+from inference import FEATURE_COLUMNS
+
+
+ALGORITHMS = ["random_forest", "svm", "xgboost"]
+
+# Search spaces for each algorithm, searched by successive halving
+PARAM_GRIDS = {
+    "random_forest": {
+        'n_estimators': [100, 200, 300, 500, 1000],
+        'max_depth': [10, 20, 30, 50, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 'log2', None],
+        'bootstrap': [True, False]
+    },
+    "svm": {
+        'C': [0.1, 1, 10, 100],     # Regularization parameter
+        'gamma': [1, 0.1, 0.01, 0.001],  # Kernel coefficient
+        'kernel': ['rbf', 'linear']  # Kernels to try
+    },
+    "xgboost": {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [3, 4, 6, 8],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 1.0],
+        'colsample_bytree': [0.7, 1.0]
+    },
+}
+
+SEARCH_CACHE_DIR = os.environ.get("SEARCH_CACHE_DIR", os.path.join(".cache", "search"))
+
+
+# Load dataset
+def load_data(filepath):
+    return load_symptom_data(filepath, dropna=True)
+
+
+# Preprocess data
+def preprocess_data(data):
+    # Encode categorical variables
+    le_gender = LabelEncoder()
+    le_marital_status = LabelEncoder()
+    le_schizophrenia = LabelEncoder()
+
+    data = data.copy()
+    data['Gender'] = le_gender.fit_transform(data['Gender'])
+    data['Marital_Status'] = le_marital_status.fit_transform(data['Marital_Status'])
+    data['Schizophrenia'] = le_schizophrenia.fit_transform(data['Schizophrenia'])
+
+    for column in SYMPTOM_COLUMNS:
+        data[column] = data[column].round(2)
+
+    # Select only the features for the model
+    feature_columns = list(FEATURE_COLUMNS)
+    X = data[feature_columns]
+    y = data['Schizophrenia']
+
+    # Standardize the features
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    return X_scaled, y, le_gender, le_marital_status, le_schizophrenia, scaler, feature_columns
+
+
+def save_model(model, scaler, le_gender, le_marital_status, le_schizophrenia, feature_columns, filename="model.pkl"):
+    """
+    Save the trained model, scaler, label encoders, and feature column names as a .pkl file.
+    """
+    model_data = {
+        "model": model,
+        "scaler": scaler,
+        "le_gender": le_gender,
+        "le_marital_status": le_marital_status,
+        "le_schizophrenia": le_schizophrenia,
+        "feature_columns": feature_columns
+    }
+    joblib.dump(model_data, filename)
+    print(f"Model and preprocessing objects saved to {filename}")
+
+
+def make_estimator(algorithm, n_jobs=None, **params):
+    """
+    Returns an unfitted estimator with the repo's default settings for
+    `algorithm`. `n_jobs` caps the threads a random forest or xgboost fit
+    uses (xgboost otherwise takes every core); the SVC is single-threaded.
+    """
+    if algorithm == "random_forest":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(random_state=42, n_jobs=n_jobs, **params)
+    elif algorithm == "svm":
+        from sklearn.svm import SVC
+        settings = dict(kernel="rbf", C=10, gamma=0.1, probability=True, class_weight="balanced")
+        settings.update(params)
+        return SVC(**settings)
+    elif algorithm == "xgboost":
+        try:
+            from xgboost import XGBClassifier
+        except ImportError:
+            raise ImportError("The xgboost algorithm requires the xgboost package (pip install xgboost)") from None
+        return XGBClassifier(random_state=42, eval_metric='mlogloss', n_jobs=n_jobs, **params)
+    else:
+        raise ValueError(f"Unsupported algorithm {algorithm!r}. Choose one of: {', '.join(ALGORITHMS)}.")
+
+
+# Train model with specified algorithm
+def train_model(X_train, y_train, algorithm="random_forest", search=True, n_candidates=81, cv=5,
+                time_budget=None, max_fits=None, cache_dir=SEARCH_CACHE_DIR, n_jobs=-1, verbose=1):
+    """
+    Trains `algorithm` on the given data. With search=True its PARAM_GRIDS
+    entry is searched by successive halving within `time_budget` seconds
+    and/or `max_fits` fits. Fold scores are cached under `cache_dir`, so an
+    interrupted or repeated search resumes instead of starting over. With
+    search=False the default estimator is fit directly. `n_jobs` is the
+    core budget: the search runs that many single-threaded fits at once, and
+    the final fit uses that many threads.
+    """
+    if not search:
+        return make_estimator(algorithm, n_jobs=n_jobs).fit(X_train, y_train)
+
+    # The search already runs fits in parallel, so each fit gets one thread
+    estimator = make_estimator(algorithm, n_jobs=1)
+
+    if algorithm == "svm":
+        # Platt scaling only matters for the final model, not for ranking candidates
+        estimator.set_params(probability=False)
+    search_cv = SuccessiveHalvingSearch(
+        estimator,
+        PARAM_GRIDS[algorithm],
+        n_candidates=n_candidates,
+        cv=cv,
+        time_budget=time_budget,
+        max_fits=max_fits,
+        cache_path=os.path.join(cache_dir, f"{algorithm}.jsonl") if cache_dir else None,
+        n_jobs=n_jobs,
+        refit=False,
+        verbose=verbose,
+    )
+    search_cv.fit(np.asarray(X_train), np.asarray(y_train))
+    print(f"Best Parameters: {search_cv.best_params_} (cv accuracy {search_cv.best_score_:.4f}, "
+          f"{search_cv.n_fits_} fits, {search_cv.n_cached_} cached)")
+    return make_estimator(algorithm, n_jobs=n_jobs, **search_cv.best_params_).fit(X_train, y_train)
+
+
+# Save data to Excel with colored rows based on schizophrenia levels
+def save_test_data_to_excel(test_data, test_labels, le_schizophrenia, filepath="test_data.xlsx"):
+    """
+    Writes the test rows with their decoded Schizophrenia level to `filepath`,
+    each row filled with its level's color (see excel_export.CLASS_FILLS).
+    """
+    test_data = pd.DataFrame(test_data).copy()
+    test_data['Schizophrenia'] = le_schizophrenia.inverse_transform(np.asarray(test_labels).ravel())
+    write_colored_excel(test_data, filepath, sheet_name="Test Data")
+    print(f"Test data saved to {filepath}")
+
+
+# Predict Schizophrenia stage
+def predict_stage(model, scaler, le_schizophrenia, user_input):
+    # Prepare input data
+    user_input_scaled = scaler.transform(pd.DataFrame([user_input], columns=FEATURE_COLUMNS))
+    prediction = model.predict(user_input_scaled)
+    return le_schizophrenia.inverse_transform(prediction)[0]
@@ -0,0 +1,164 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from metrics import stage_timer
+
+
+HASH_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", 200000))
+
+SELECT_PASSWORD = "SELECT password FROM users WHERE username=?"
+UPDATE_PASSWORD = "UPDATE users SET password=? WHERE username=?"
+
+
+def hash_password(password, iterations=PASSWORD_HASH_ITERATIONS, salt=None):
+    """Returns "pbkdf2_sha256$<iterations>$<salt>$<hash>" for `password`."""
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return "$".join([HASH_ALGORITHM, str(iterations),
+                     base64.b64encode(salt).decode(), base64.b64encode(digest).decode()])
+
+
+def is_password_hash(value):
+    return isinstance(value, str) and value.startswith(HASH_ALGORITHM + "$")
+
+
+def verify_password(password, stored):
+    """
+    Checks `password` against a stored hash in constant time. Returns
+    (matches, iterations) so callers can upgrade hashes made with an older
+    cost setting.
+    """
+    _, iterations, salt, expected = stored.split("$")
+    iterations = int(iterations)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), base64.b64decode(salt), iterations)
+    return hmac.compare_digest(digest, base64.b64decode(expected)), iterations
+
+
+class UserStore:
+    """
+    Login store on top of users.db.
+
+    Connections come from a small pool and run in WAL mode, so concurrent
+    logins do not each pay for a new connection or block behind the
+    rollback journal; the lookup statement is reused from each connection's
+    prepared-statement cache. Passwords are stored as PBKDF2 hashes with a
+    tunable iteration count, and the hashing runs on a bounded executor
+    (hashlib releases the GIL while it works) so a login storm uses at most
+    `hash_workers` cores for key derivation.
+    """
+
+    def __init__(self, path="users.db", pool_size=8, iterations=PASSWORD_HASH_ITERATIONS, hash_workers=None):
+        self.path = path
+        self.iterations = iterations
+        self._pool = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._created = 0
+        self._lock = threading.Lock()
+        self._hasher = ThreadPoolExecutor(max_workers=hash_workers or os.cpu_count() or 1,
+                                          thread_name_prefix="password-hash")
+        # Unknown users are checked against this so they take as long as known ones
+        self._dummy_hash = hash_password("", iterations)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._pool_size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def setup(self):
+        """Creates the users table and seeds the default admin into an empty store."""
+        with self.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password TEXT
+                )
+            """)
+            if not conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+                conn.execute("INSERT INTO users (username, password) VALUES (?, ?)",
+                             ("admin", hash_password("password", self.iterations)))
+                conn.commit()
+            plaintext = sum(1 for (password,) in conn.execute("SELECT password FROM users")
+                            if not is_password_hash(password))
+        if plaintext:
+            print(f"{plaintext} user(s) in {self.path} have plaintext passwords and cannot log in; "
+                  f"run `python user_store.py migrate {self.path}`")
+
+    def migrate(self):
+        """Hashes any plaintext passwords. Returns how many were hashed."""
+        with self.connection() as conn:
+            plaintext = [(hash_password(password, self.iterations), username)
+                         for username, password in conn.execute("SELECT username, password FROM users")
+                         if not is_password_hash(password)]
+            conn.executemany(UPDATE_PASSWORD, plaintext)
+            conn.commit()
+        return len(plaintext)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._hasher.shutdown()
+
+    def set_password(self, username, password):
+        stored = self._hasher.submit(hash_password, password, self.iterations).result()
+        with self.connection() as conn:
+            conn.execute(UPDATE_PASSWORD, (stored, username))
+            conn.commit()
+
+    def authenticate(self, username, password):
+        if not username or password is None:
+            return False
+        with stage_timer("login_db"), self.connection() as conn:
+            row = conn.execute(SELECT_PASSWORD, (username,)).fetchone()
+        stored = row[0] if row and is_password_hash(row[0]) else self._dummy_hash
+        with stage_timer("login_verify"):
+            matches, iterations = self._hasher.submit(verify_password, password, stored).result()
+        if not row or stored is self._dummy_hash:
+            return False
+        if matches and iterations != self.iterations:
+            # Upgrade hashes made with an older cost setting
+            self.set_password(username, password)
+        return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the login store.")
+    parser.add_argument("command", choices=["migrate"], help="migrate: hash any plaintext passwords")
+    parser.add_argument("path", nargs="?", default=os.environ.get("USERS_DB", "users.db"))
+    args = parser.parse_args()
+
+    store = UserStore(args.path)
+    migrated = store.migrate()
+    store.close()
+    print(f"Hashed {migrated} plaintext password(s) in {args.path}")
+
+
+if __name__ == "__main__":
+    main()